@@ -1,14 +1,13 @@
 import logging
-from pathlib import Path
 
 import rich_click as click
 
-from gitpkg.cli.console import console, success
+from gitpkg.cli.console import get_console, success
 from gitpkg.cli.helpers import (
     determine_package_destination,
     render_package_name,
 )
-from gitpkg.cli.root import Context, root
+from gitpkg.cli.root import Context
 from gitpkg.config import InstallMethod, PkgConfig
 from gitpkg.errors import (
     AmbiguousDestinationError,
@@ -22,7 +21,7 @@ from gitpkg.utils import (
 )
 
 
-@root.command("add", help="Add and install a package to a destination")
+@click.command("add", help="Add and install a package to a destination")
 @click.argument("repository_url")
 @click.option("--name", help="Overwrite the name of the package")
 @click.option("--dest-name", help="Target destination name")
@@ -65,14 +64,16 @@ def cmd_add(
     disable_updates: bool,
     install_method: str | None,
 ) -> None:
-    pm = ctx.package_manager()
-
-    parse_url_result = parse_repository_url(repository_url)
+    parse_url_result = parse_repository_url(repository_url, ctx.working_dir)
 
     if not parse_url_result:
         msg = f"URL: {repository_url} does not seem to be a valid git url"
         raise GitPkgError(msg)
 
+    # opening the repository (and importing GitPython) is only worth it
+    # once the arguments are known to be valid
+    pm = ctx.package_manager()
+
     repository_url, _ = parse_url_result
 
     package_root_value = "."
@@ -87,26 +88,15 @@ def cmd_add(
     if not name:
         name = extract_repository_name_from_url(repository_url)
 
-    dest = determine_package_destination(pm, dest_name, return_none=True)
-
-    # if no destinations are known add current location as dest
-    if not dest and len(pm.destinations()) == 0:
-        cwd = Path.cwd()
-
-        logging.debug(f"register cwd as destination {cwd.absolute()}")
-        dest = pm.add_destination(cwd.name, cwd)
-
-    if not dest:
-        raise AmbiguousDestinationError
-
     install_method_enum = InstallMethod.from_string(install_method)
 
     if (
         install_method_enum != InstallMethod.COPY or install_method is None
     ) and is_windows():
         logging.warning(
-            f"Install method {install_method} is not supported on "
-            f"Windows, changing it to 'copy'"
+            "Install method %s is not supported on Windows, "
+            "changing it to 'copy'",
+            install_method,
         )
         install_method_enum = InstallMethod.COPY
 
@@ -119,21 +109,36 @@ def cmd_add(
         install_method=install_method_enum.value,
     )
 
-    if not pm.is_package_registered(dest, pkg):
-        pm.add_package(dest, pkg)
-
-    pkg_name = render_package_name(pm, dest, pkg)
-
-    try:
-        with console.status(f"[bold green]Installing {pkg_name}..."):
-            pm.install_package(dest, pkg)
-            location = pm.package_install_location(dest, pkg).relative_to(
-                pm.project_root_directory()
-            )
-            pkg_name = render_package_name(pm, dest, pkg)
-            success(
-                f"Successfully installed package {pkg_name} at '{location}'",
-            )
-    except PackageRootDirNotFoundError as err:
-        pm.remove_package(dest, pkg)
-        raise err
+    # write the config once, after the destination and package were added
+    with pm.batch():
+        dest = determine_package_destination(pm, dest_name, return_none=True)
+
+        # if no destinations are known add current location as dest
+        if not dest and len(pm.destinations()) == 0:
+            cwd = ctx.cwd()
+
+            logging.debug("register cwd as destination %s", cwd.absolute())
+            dest = pm.add_destination(cwd.name, cwd)
+
+        if not dest:
+            raise AmbiguousDestinationError
+
+        if not pm.is_package_registered(dest, pkg):
+            pm.add_package(dest, pkg)
+
+        pkg_name = render_package_name(pm, dest, pkg)
+
+        try:
+            with get_console().status(f"[bold green]Installing {pkg_name}..."):
+                pm.install_package(dest, pkg)
+                location = pm.package_install_location(dest, pkg).relative_to(
+                    pm.project_root_directory()
+                )
+                pkg_name = render_package_name(pm, dest, pkg)
+                success(
+                    f"Successfully installed package {pkg_name} "
+                    f"at '{location}'",
+                )
+        except PackageRootDirNotFoundError as err:
+            pm.remove_package(dest, pkg)
+            raise err
@@ -1,16 +1,64 @@
+from __future__ import annotations
+
 import shutil
+from functools import cache
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from rich.console import Console
 
-from rich.console import Console
 
-console = Console(
-    width=shutil.get_terminal_size().columns,
-)
+@cache
+def get_console() -> Console:
+    """Shared console, only created once something is actually printed"""
+    from rich.console import Console
+
+    return Console(
+        width=shutil.get_terminal_size().columns,
+    )
 
 
 def fatal(*args, **kwargs) -> None:
-    console.print(":cross_mark:  ERROR:", *args, **kwargs)
+    get_console().print(":cross_mark:  ERROR:", *args, **kwargs)
     exit(1)
 
 
 def success(*args, **kwargs) -> None:
-    console.print(":white_check_mark:  ", *args, **kwargs)
+    get_console().print(":white_check_mark:  ", *args, **kwargs)
+
+
+def print_table(
+    title: str, columns: list[str], rows: list[list[str | None]]
+) -> None:
+    """Print rows as a rich table, or as tab separated values with a header
+    line when the output is not a terminal (e.g. piped into another program)"""
+    console = get_console()
+
+    if console.is_terminal:
+        from rich.table import Table
+
+        table = Table(
+            title=title,
+            show_header=True,
+            header_style="bold magenta",
+            box=None,
+        )
+
+        for column in columns:
+            table.add_column(column, overflow="fold")
+
+        for row in rows:
+            table.add_row(*row)
+
+        console.print(table)
+        return
+
+    from rich.text import Text
+
+    # tab separated values with a header line, cells may contain rich markup
+    # so only the plain text is emitted
+    lines = [columns] + [
+        [Text.from_markup(cell or "").plain for cell in row] for row in rows
+    ]
+
+    console.file.write("".join("\t".join(line) + "\n" for line in lines))
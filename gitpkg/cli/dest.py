@@ -1,10 +1,8 @@
 import logging
-from pathlib import Path
 
 import rich_click as click
-from rich.table import Table
 
-from gitpkg.cli.console import console, success
+from gitpkg.cli.console import get_console, print_table, success
 from gitpkg.cli.root import Context
 
 
@@ -17,25 +15,20 @@ def cmd_dest():
 @click.pass_obj
 def cmd_dest_list(ctx: Context) -> None:
     pm = ctx.package_manager()
+    dests = pm.destinations()
 
-    if len(pm.destinations()) == 0:
-        console.print("No destinations registered yet!")
+    if len(dests) == 0:
+        get_console().print("No destinations registered yet!")
         return
 
-    table = Table(
-        title="Destinations",
-        show_header=True,
-        header_style="bold magenta",
-        box=None,
-    )
-
-    table.add_column("Name", overflow="fold")
-    table.add_column("Path", overflow="fold")
+    # destination paths are stored relative to the project root
+    root_dir = pm.project_root_directory()
 
-    for dest in pm.destinations():
-        table.add_row(dest.name, str(Path(dest.path).absolute()))
-
-    console.print(table)
+    print_table(
+        "Destinations",
+        ["Name", "Path"],
+        [[dest.name, str(root_dir / dest.path)] for dest in dests],
+    )
 
 
 @cmd_dest.command("add", help="Adds a new destination")
@@ -52,8 +45,8 @@ def cmd_dest_list(ctx: Context) -> None:
 def cmd_dest_add(ctx: Context, path: str, name: str | None) -> None:
     pm = ctx.package_manager()
 
-    dest_path = Path().absolute() / path
-    logging.debug(f"New destination path: '{dest_path}'")
+    dest_path = ctx.cwd() / path
+    logging.debug("New destination path: '%s'", dest_path)
 
     if not dest_path.exists():
         dest_path.mkdir(parents=True)
@@ -63,7 +56,7 @@ def cmd_dest_add(ctx: Context, path: str, name: str | None) -> None:
     if name:
         dest_name = name
 
-    logging.debug(f"New destination name: '{name}'")
+    logging.debug("New destination name: '%s'", name)
 
     dest = pm.add_destination(dest_name, dest_path)
 
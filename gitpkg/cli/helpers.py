@@ -1,6 +1,12 @@
-from gitpkg.config import Destination, PkgConfig
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
 from gitpkg.errors import AmbiguousDestinationError
-from gitpkg.pkg_manager import PkgManager
+
+if TYPE_CHECKING:
+    from gitpkg.config import Destination, PkgConfig
+    from gitpkg.pkg_manager import PkgManager, PkgStats
 
 
 def render_package_name(
@@ -9,31 +15,37 @@ def render_package_name(
     pkg: PkgConfig,
     hide_dest: bool = False,
     hide_stats: bool = False,
+    stats: PkgStats | None = None,
 ) -> str:
     prefix = ""
     pkg_name = f"[bold]{pkg.name}[/bold]"
     suffix = ""
 
-    if not hide_stats and pm.is_package_installed(dest, pkg):
-        stats = pm.package_stats(dest, pkg)
+    if not hide_stats:
+        # avoid fetching the stats again if the caller already has them
+        if stats is None and pm.is_package_installed(dest, pkg):
+            stats = pm.package_stats(dest, pkg)
         if stats:
             suffix = f" ({stats.commit_hash[0:7]})"
 
-    if not hide_dest and len(pm.destinations()) > 1:
+    if not hide_dest:
         count = 0
         for d in pm.destinations():
-            if pm.is_package_registered(d, pkg):
-                count += 1
-        if count > 1:
-            prefix = f"{dest.name}/"
-    return prefix + pkg_name + suffix
+            if not pm.is_package_registered(d, pkg):
+                continue
+            count += 1
+            # we only need to know if there is more than one
+            if count > 1:
+                prefix = f"{dest.name}/"
+                break
+    return f"{prefix}{pkg_name}{suffix}"
 
 
 def parse_package_name(package_name: str) -> tuple[str | None, str | None]:
-    if "/" in package_name:
-        dest_name, pkg_name = package_name.split("/")
-        return dest_name, pkg_name
-    return None, package_name
+    dest_name, separator, pkg_name = package_name.partition("/")
+    if not separator:
+        return None, package_name
+    return dest_name, pkg_name
 
 
 def determine_package_destination(
@@ -45,21 +57,17 @@ def determine_package_destination(
     if dest_name:
         return pm.find_destination(dest_name)
 
-    if len(pm.destinations()) == 1:
-        return pm.destinations()[0]
+    dests = pm.destinations()
 
-    if pkg_name is not None:
-        found_num = 0
-        found_dest = None
+    if len(dests) == 1:
+        return dests[0]
 
-        for dest in pm.destinations():
-            for pkg in pm.find_packages_by_destination(dest):
-                if pkg.name == pkg_name:
-                    found_num += 1
-                    found_dest = dest
+    if pkg_name is not None:
+        locations = pm.locate_package(pkg_name)
 
-        if found_dest and found_num == 1:
-            return found_dest
+        if len(locations) == 1:
+            dest, _ = locations[0]
+            return dest
 
     if return_none:
         return None
@@ -1,10 +1,19 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
 import rich_click as click
-from rich.tree import Tree
 
-from gitpkg.cli.console import console
+from gitpkg.cli.console import get_console
 from gitpkg.cli.helpers import render_package_name
-from gitpkg.cli.root import Context
-from gitpkg.errors import PackageAlreadyInstalledError
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    from rich.status import Status
+
+    from gitpkg.cli.root import Context
+    from gitpkg.config import Destination, PkgConfig
 
 
 @click.command(
@@ -13,36 +22,48 @@ from gitpkg.errors import PackageAlreadyInstalledError
 )
 @click.pass_obj
 def cmd_install(ctx: Context) -> None:
+    from rich.tree import Tree
+
     pm = ctx.package_manager()
 
     tree = Tree("Installed packages:")
 
-    found_any = False
+    packages = [
+        (dest, pkg)
+        for dest in pm.destinations()
+        for pkg in pm.find_packages_by_destination(dest)
+    ]
 
-    with console.status("[bold green]Installing packages...") as status:
-        for dest in pm.destinations():
-            for pkg in pm.find_packages_by_destination(dest):
-                pkg_name = render_package_name(pm, dest, pkg)
-                status.update(f"[bold green]Installing {pkg_name}...")
+    def packages_to_install(
+        status: Status,
+    ) -> Iterator[tuple[Destination, PkgConfig]]:
+        # installs happen lazily, announce each package once it is its turn
+        for dest, pkg in packages:
+            pkg_name = render_package_name(pm, dest, pkg)
+            status.update(f"[bold green]Installing {pkg_name}...")
+            yield dest, pkg
 
-                found_any = True
+    with (
+        get_console().status("[bold green]Installing packages...") as status,
+        pm.batch(),
+    ):
+        for dest, pkg, installed in pm.install_packages(
+            packages_to_install(status)
+        ):
+            pkg_name = render_package_name(pm, dest, pkg)
 
-                try:
-                    pm.install_package(dest, pkg)
-                except PackageAlreadyInstalledError:
-                    pkg_name = render_package_name(pm, dest, pkg)
-                    tree.add(
-                        f"{pkg_name} is already installed.",
-                        style="dim",
-                        guide_style="dim",
-                    )
-                    continue
+            if not installed:
+                tree.add(
+                    f"{pkg_name} is already installed.",
+                    style="dim",
+                    guide_style="dim",
+                )
+                continue
 
-                pkg_name = render_package_name(pm, dest, pkg)
-                tree.add(f"{pkg_name} has been installed.")
+            tree.add(f"{pkg_name} has been installed.")
 
-        if found_any:
-            console.print(tree)
+        if packages:
+            get_console().print(tree)
             return
 
-        console.print("No packages were installed.")
+        get_console().print("No packages were installed.")
@@ -1,65 +1,54 @@
 import rich_click as click
-from rich.table import Table
 
-from gitpkg.cli.console import console
+from gitpkg.cli.console import get_console, print_table
 from gitpkg.cli.helpers import render_package_name
-from gitpkg.cli.root import Context, root
+from gitpkg.cli.root import Context
 
 
-@root.command("list", help="List packages")
+@click.command("list", help="List packages")
 @click.pass_obj
 def cmd_list(ctx: Context) -> None:
     pm = ctx.package_manager()
+    dests = pm.destinations()
 
-    """List installed packages"""
-
-    if len(pm.destinations()) == 0:
-        console.print(
+    if len(dests) == 0:
+        get_console().print(
             "No destinations registered yet",
         )
         return
 
-    table = Table(
-        title="Packages",
-        show_header=True,
-        header_style="bold magenta",
-        box=None,
-    )
-
-    table.add_column("Name", overflow="fold")
-    table.add_column("Install Dir", overflow="fold")
-    table.add_column("Hash", overflow="fold")
-    table.add_column("Last Update", overflow="fold")
+    rows = []
+    root_dir = pm.project_root_directory()
 
-    found_one = False
-
-    for dest in pm.destinations():
+    for dest in dests:
         for pkg in pm.find_packages_by_destination(dest):
-            found_one = True
-
             install_dir = pm.package_install_location(dest, pkg).relative_to(
-                pm.project_root_directory()
+                root_dir
             )
 
             stats = pm.package_stats(dest, pkg)
 
-            table.add_row(
-                render_package_name(
-                    pm,
-                    dest,
-                    pkg,
-                    hide_dest=True,
-                    hide_stats=True,
-                ),
-                str(install_dir),
-                stats.commit_hash[0:7] if stats else None,
-                stats.commit_date.isoformat() if stats else None,
+            rows.append(
+                [
+                    render_package_name(
+                        pm,
+                        dest,
+                        pkg,
+                        hide_dest=True,
+                        hide_stats=True,
+                    ),
+                    str(install_dir),
+                    stats.commit_hash[0:7] if stats else None,
+                    stats.commit_date.isoformat() if stats else None,
+                ]
             )
 
-    if not found_one:
-        console.print(
+    if len(rows) == 0:
+        get_console().print(
             "No packages have been installed yet, add one via 'add URL'"
         )
         return
 
-    console.print(table)
+    print_table(
+        "Packages", ["Name", "Install Dir", "Hash", "Last Update"], rows
+    )
@@ -6,10 +6,10 @@ from gitpkg.cli.helpers import (
     parse_package_name,
     render_package_name,
 )
-from gitpkg.cli.root import Context, root
+from gitpkg.cli.root import Context
 
 
-@root.command("remove", help="Remove a package")
+@click.command("remove", help="Remove a package")
 @click.argument("package_name")
 @click.pass_obj
 def cmd_remove(ctx: Context, package_name: str) -> None:
@@ -1,24 +1,88 @@
+from __future__ import annotations
+
+import importlib
 from dataclasses import dataclass
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 import rich_click as click
-from rich_click import Context as CLIContext
 
-from gitpkg.pkg_manager import PkgManager
+if TYPE_CHECKING:
+    from rich_click import Context as CLIContext
+
+    from gitpkg.pkg_manager import PkgManager
 
 
 @dataclass
 class Context:
     repository_root: str | None
     debug_mode: bool
+    working_dir: Path | None = None
+
+    def cwd(self) -> Path:
+        """Directory git pkg acts in, by default the current directory"""
+        if self.working_dir:
+            return self.working_dir
+        return Path.cwd()
 
     def package_manager(self) -> PkgManager:
+        from gitpkg.pkg_manager import PkgManager
+
         if self.repository_root:
             return PkgManager.from_path(Path(self.repository_root))
-        return PkgManager.from_environment()
+        return PkgManager.from_environment(self.working_dir)
+
+
+# registry of all root level commands, name -> "module:attribute"
+_COMMANDS = {
+    "add": "gitpkg.cli.add:cmd_add",
+    "dest": "gitpkg.cli.dest:cmd_dest",
+    "install": "gitpkg.cli.install:cmd_install",
+    "list": "gitpkg.cli.list:cmd_list",
+    "remove": "gitpkg.cli.remove:cmd_remove",
+    "update": "gitpkg.cli.update:cmd_update",
+    "version": "gitpkg.cli.version:cmd_version",
+}
+
+
+class LazyGroup(click.RichGroup):
+    """Command group that only imports a subcommand once it is needed"""
 
+    def __init__(
+        self,
+        *args,
+        lazy_subcommands: dict[str, str] | None = None,
+        **kwargs,
+    ):
+        super().__init__(*args, **kwargs)
+        # maps command name -> "module:attribute"
+        self.lazy_subcommands = lazy_subcommands or {}
+        self._lazy_command_names = sorted(self.lazy_subcommands)
+        self._loaded_commands: dict[str, click.Command] = {}
 
-@click.group()
+    def list_commands(self, ctx: CLIContext) -> list[str]:
+        if not self.commands:
+            return [*self._lazy_command_names]
+        return sorted([*super().list_commands(ctx), *self.lazy_subcommands])
+
+    def get_command(
+        self, ctx: CLIContext, cmd_name: str
+    ) -> click.Command | None:
+        if cmd_name in self.lazy_subcommands:
+            return self._load_command(cmd_name)
+        return super().get_command(ctx, cmd_name)
+
+    def _load_command(self, cmd_name: str) -> click.Command:
+        if cmd_name in self._loaded_commands:
+            return self._loaded_commands[cmd_name]
+
+        module_name, attr_name = self.lazy_subcommands[cmd_name].split(":")
+        command = getattr(importlib.import_module(module_name), attr_name)
+        self._loaded_commands[cmd_name] = command
+        return command
+
+
+@click.group(cls=LazyGroup, lazy_subcommands=_COMMANDS)
 @click.option(
     "--repository-root",
     help="Define the repository root directory, by default git pkg will "
@@ -26,6 +90,15 @@ class Context:
     type=click.Path(exists=True, file_okay=False, dir_okay=True),
     envvar="GITPKG_REPOSITORY_ROOT",
 )
+@click.option(
+    "-C",
+    "--cwd",
+    help="Run as if git pkg was started in this directory instead of the "
+    "current working directory.",
+    type=click.Path(
+        exists=True, file_okay=False, dir_okay=True, path_type=Path
+    ),
+)
 @click.option(
     "--debug",
     help="Enable debug setting.",
@@ -33,5 +106,10 @@ class Context:
     envvar="GITPKG_DEBUG",
 )
 @click.pass_context
-def root(ctx: CLIContext, repository_root: str | None, debug: bool):
-    ctx.obj = Context(repository_root, debug)
+def root(
+    ctx: CLIContext,
+    repository_root: str | None,
+    cwd: Path | None,
+    debug: bool,
+):
+    ctx.obj = Context(repository_root, debug, cwd.absolute() if cwd else None)
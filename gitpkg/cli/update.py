@@ -1,9 +1,9 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import TYPE_CHECKING
 
 import rich_click as click
-from rich.tree import Tree
 
-from gitpkg.cli.console import console
+from gitpkg.cli.console import get_console
 from gitpkg.cli.helpers import (
     determine_package_destination,
     parse_package_name,
@@ -11,10 +11,12 @@ from gitpkg.cli.helpers import (
 )
 from gitpkg.cli.root import Context
 from gitpkg.errors import CouldNotFindDestinationError, UnknownPackageError
-from gitpkg.pkg_manager import PkgUpdateResult
 
 if TYPE_CHECKING:
     from gitpkg.config import Destination, PkgConfig
+    from gitpkg.pkg_manager import PkgStats
+
+_MAX_UPDATE_WORKERS = 8
 
 
 @click.command("update", help="Update all (or one of the specified) packages")
@@ -33,6 +35,10 @@ if TYPE_CHECKING:
 def cmd_update(
     ctx: Context, packages: list[str], force: bool, check: bool
 ) -> None:
+    from rich.tree import Tree
+
+    from gitpkg.pkg_manager import PkgUpdateResult
+
     pm = ctx.package_manager()
 
     to_install: list[tuple[Destination, PkgConfig]] = []
@@ -63,29 +69,54 @@ def cmd_update(
 
     tree = Tree("Package update results:")
 
-    updated_packages: dict[str, PkgUpdateResult] = {}
+    # there is no need to update a repo again if two packages share it
+    to_update: dict[str, tuple[Destination, PkgConfig]] = {}
 
-    with console.status("[bold green]Updating packages...") as status:
-        for dest, pkg in to_install:
-            pkg_ident = pm.package_identifier(dest, pkg)
+    for dest, pkg in to_install:
+        to_update.setdefault(pm.package_identifier(dest, pkg), (dest, pkg))
 
-            # there is no need to update a repo again if two
-            # packages share it
-            if pkg_ident not in updated_packages:
-                pkg_name = render_package_name(pm, dest, pkg)
-                status.update(f"[bold green]Updating {pkg_name}...")
+    stats_before_update: dict[str, PkgStats | None] = {
+        pkg_ident: pm.package_stats(dest, pkg)
+        for pkg_ident, (dest, pkg) in to_update.items()
+    }
 
-                stats_before_update = pm.package_stats(dest, pkg)
-                updated_packages[pkg_ident] = pm.update_package(
+    updated_packages: dict[str, PkgUpdateResult] = {}
+
+    with get_console().status("[bold green]Updating packages...") as status:
+        # every package lives in its own repository, so the updates (which
+        # mostly wait on git and the network) can run concurrently
+        with ThreadPoolExecutor(
+            max_workers=max(1, min(_MAX_UPDATE_WORKERS, len(to_update)))
+        ) as executor:
+            futures = {
+                executor.submit(
+                    pm.update_package,
                     dest,
                     pkg,
                     discard_untracked_changes=force,
                     check_only=check,
+                ): pkg_ident
+                for pkg_ident, (dest, pkg) in to_update.items()
+            }
+
+            for done, future in enumerate(as_completed(futures), start=1):
+                updated_packages[futures[future]] = future.result()
+                status.update(
+                    f"[bold green]Updating packages... "
+                    f"({done}/{len(futures)})"
                 )
 
+        for dest, pkg in to_install:
+            pkg_ident = pm.package_identifier(dest, pkg)
             update_result = updated_packages[pkg_ident]
 
-            pkg_name = render_package_name(pm, dest, pkg)
+            # only updated packages moved their checkout, the others can
+            # reuse the stats fetched before the update
+            stats = None
+            if update_result != PkgUpdateResult.UPDATED:
+                stats = stats_before_update[pkg_ident]
+
+            pkg_name = render_package_name(pm, dest, pkg, stats=stats)
 
             match update_result:
                 case PkgUpdateResult.NO_UPDATE_AVAILABLE:
@@ -97,7 +128,7 @@ def cmd_update(
                 case PkgUpdateResult.UPDATES_DISABLED:
                     tree.add(f"{pkg_name} has updates disabled.")
                 case PkgUpdateResult.UPDATED:
-                    old_hash = stats_before_update.commit_hash[0:7]
+                    old_hash = stats_before_update[pkg_ident].commit_hash[0:7]
                     tree.add(
                         f"{pkg_name} was updated from ({old_hash})",
                         style="green",
@@ -116,4 +147,4 @@ def cmd_update(
                         guide_style="red",
                     )
 
-        console.print(tree)
+        get_console().print(tree)
@@ -1,8 +1,9 @@
+import rich_click as click
+
 from gitpkg._version import __version__
-from gitpkg.cli.console import console
-from gitpkg.cli.root import root
+from gitpkg.cli.console import get_console
 
 
-@root.command("version", help="Print version info")
+@click.command("version", help="Print version info")
 def cmd_version():
-    console.print(__version__)
+    get_console().print(__version__)
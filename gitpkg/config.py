@@ -1,11 +1,25 @@
 from __future__ import annotations
 
+import json
 import logging
-from dataclasses import dataclass, field
+import sys
+import time
+from dataclasses import asdict, dataclass, field, fields
 from enum import Enum
+from functools import cache
 from pathlib import Path
+from typing import Any, TypeVar, get_args, get_type_hints
 
-from dataclass_binder import Binder
+if sys.version_info < (3, 11):  # noqa: UP036
+    import tomli as tomllib
+else:
+    import tomllib
+
+_T = TypeVar("_T")
+
+# config files changed this recently are not cached, a second write within
+# the file system timestamp granularity would not change the cache key
+_CACHE_MIN_AGE_NS = 2_000_000_000
 
 
 class InstallMethod(Enum):
@@ -50,8 +64,71 @@ class Config:
     destinations: list[Destination] = field(default_factory=list)
 
     @staticmethod
-    def from_path(path: Path) -> Config:
-        return Binder(Config).parse_toml(path)
+    def from_path(path: Path, cache_file: Path | None = None) -> Config:
+        """Parse config file, if a cache file is given the parsed config is
+        stored there and reused as long as the config file is unchanged"""
+        if cache_file is None:
+            return Config._parse_toml(path)
+
+        stat = path.stat()
+        cache_key = [stat.st_mtime_ns, stat.st_size]
+
+        config = _read_cache(cache_file, cache_key)
+
+        if config is not None:
+            return config
+
+        config = Config._parse_toml(path)
+
+        if time.time_ns() - stat.st_mtime_ns > _CACHE_MIN_AGE_NS:
+            _write_cache(config, cache_file, cache_key)
+
+        return config
+
+    @staticmethod
+    def _parse_toml(path: Path) -> Config:
+        with path.open("rb") as f:
+            data = tomllib.load(f)
+
+        for key in data:
+            if key not in ("packages", "destinations"):
+                msg = f"Field 'Config.{key}' does not exist"
+                raise ValueError(msg)
+
+        packages = data.get("packages", {})
+        _check_type(packages, dict, "Config.packages")
+
+        destinations = data.get("destinations", [])
+        _check_type(destinations, list, "Config.destinations")
+
+        for dest_name, dest_packages in packages.items():
+            _check_type(dest_packages, list, f'Config.packages["{dest_name}"]')
+
+        return Config(
+            packages={
+                dest_name: [
+                    _bind_keys(
+                        PkgConfig, pkg, f'Config.packages["{dest_name}"]'
+                    )
+                    for pkg in dest_packages
+                ]
+                for dest_name, dest_packages in packages.items()
+            },
+            destinations=[
+                _bind_keys(Destination, dest, "Config.destinations")
+                for dest in destinations
+            ],
+        )
+
+    @staticmethod
+    def from_dict(data: dict[str, Any]) -> Config:
+        return Config(
+            packages={
+                dest_name: [PkgConfig(**pkg) for pkg in packages]
+                for dest_name, packages in data["packages"].items()
+            },
+            destinations=[Destination(**dest) for dest in data["destinations"]],
+        )
 
     def to_toml_string(self) -> str:
         lines = []
@@ -78,3 +155,94 @@ class Config:
             lines.append("")
 
         return "\n".join(lines)
+
+
+def _read_cache(cache_file: Path, cache_key: list[int]) -> Config | None:
+    try:
+        cache = json.loads(cache_file.read_bytes())
+
+        if cache["key"] != cache_key:
+            return None
+
+        return Config.from_dict(cache["config"])
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def _write_cache(
+    config: Config, cache_file: Path, cache_key: list[int]
+) -> None:
+    tmp_file = cache_file.with_name(f"{cache_file.name}.tmp")
+
+    try:
+        tmp_file.write_text(
+            json.dumps({"key": cache_key, "config": asdict(config)})
+        )
+        tmp_file.replace(cache_file)
+    except OSError:
+        logging.debug("could not write config cache %s", cache_file)
+
+
+_TOML_TYPE_NAMES = {
+    dict: "table",
+    list: "array",
+    str: "string",
+    bool: "boolean",
+}
+
+
+def _check_type(value: Any, expected: type, context: str) -> None:
+    if not isinstance(value, expected):
+        msg = (
+            f"Field '{context}' must be a {_TOML_TYPE_NAMES[expected]}, "
+            f"got {type(value).__name__}"
+        )
+        raise ValueError(msg)
+
+
+@cache
+def _field_types(cls: type) -> dict[str, tuple[type, ...]]:
+    """Accepted value types per field, optional fields accept None"""
+    hints = get_type_hints(cls)
+    return {
+        f.name: get_args(hints[f.name]) or (hints[f.name],) for f in fields(cls)
+    }
+
+
+def _bind_keys(cls: type[_T], data: Any, context: str) -> _T:
+    """Create cls from a TOML table, mapping kebab-case keys to fields"""
+    _check_type(data, dict, context)
+
+    types = _field_types(cls)
+    kwargs = {}
+
+    for key, value in data.items():
+        # only kebab-case keys map to fields, otherwise "package_root" and
+        # "package-root" could both be set and the later one would win
+        if "_" in key:
+            msg = f"Underscore found in TOML key '{context}.{key}'"
+            raise ValueError(msg)
+
+        name = key.replace("-", "_")
+
+        if name not in types:
+            msg = f"Field '{context}.{key}' does not exist"
+            raise ValueError(msg)
+
+        if not isinstance(value, types[name]):
+            expected = " or ".join(
+                _TOML_TYPE_NAMES[t] for t in types[name] if t is not type(None)
+            )
+            msg = (
+                f"Field '{context}.{key}' must be a {expected}, "
+                f"got {type(value).__name__}"
+            )
+            raise ValueError(msg)
+
+        kwargs[name] = value
+
+    try:
+        return cls(**kwargs)
+    except TypeError as err:
+        msg = f"Invalid '{context}': {err}"
+        raise ValueError(msg) from None
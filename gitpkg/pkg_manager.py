@@ -5,11 +5,13 @@ import hashlib
 import logging
 import os
 import re
-import shutil
+import stat
+from contextlib import contextmanager
 from dataclasses import dataclass
 from datetime import datetime
 from filecmp import dircmp
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 from git import FetchInfo, GitConfigParser, Repo
 
@@ -26,15 +28,22 @@ from gitpkg.errors import (
     UnknownPackageError,
 )
 from gitpkg.utils import (
+    copy_tree,
     does_actually_exist,
     extract_repository_name_from_url,
     is_symlink,
     is_windows,
     safe_dir_delete,
+    write_text_atomic,
 )
 
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
 _GITPKGS_DIR = ".gitpkgs"
 _CONFIG_FILE = ".gitpkg.toml"
+# parsed config cache, stored inside the .git directory
+_CONFIG_CACHE_FILE = "gitpkg-config-cache.json"
 _NAME_REGEX = r"^[\w\-.\s]+$"
 
 
@@ -45,6 +54,45 @@ class PkgManager:
     def __init__(self, repo: Repo, config: Config):
         self._repo = repo
         self._config = config
+        self._project_root = PkgManager._project_root_directory(repo)
+        self._config_file = self._project_root / _CONFIG_FILE
+        self._gitpkgs_dir = self._project_root / _GITPKGS_DIR
+        self._gitmodules_file = self._project_root / ".gitmodules"
+        self._git_modules_dir = self._project_root / ".git" / "modules"
+        self._pkg_locations: (
+            dict[str, list[tuple[Destination, PkgConfig]]] | None
+        ) = None
+        # package identifiers only depend on (url, branch)
+        self._ident_cache: dict[tuple[str, str | None], str] = {}
+        # name based indexes, kept in sync with the config
+        self._destinations_by_name = {
+            dest.name: dest for dest in config.destinations
+        }
+        self._destination_paths = {
+            self._project_root / dest.path for dest in config.destinations
+        }
+        self._packages_by_name = {
+            dest_name: {pkg.name: pkg for pkg in packages}
+            for dest_name, packages in config.packages.items()
+        }
+        # config writes are deferred while inside of batch()
+        self._batch_depth = 0
+        self._config_dirty = False
+        # names inside of .gitpkgs, listed once and reset on changes
+        self._gitpkgs_children: set[str] | None = None
+
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """Only write the config file once the outermost batch is done"""
+        self._batch_depth += 1
+
+        try:
+            yield
+        finally:
+            self._batch_depth -= 1
+
+            if self._batch_depth == 0 and self._config_dirty:
+                self._write_config()
 
     def destinations(self) -> list[Destination]:
         """Returns all registered destinations"""
@@ -52,10 +100,7 @@ class PkgManager:
 
     def find_destination(self, destination_name: str) -> Destination | None:
         """Find destination by name"""
-        for dest in self.destinations():
-            if dest.name == destination_name:
-                return dest
-        return None
+        return self._destinations_by_name.get(destination_name)
 
     def find_packages_by_destination(
         self, destination: Destination
@@ -65,27 +110,45 @@ class PkgManager:
             return []
         return [*self._config.packages[destination.name]]
 
+    def locate_package(
+        self, pkg_name: str
+    ) -> list[tuple[Destination, PkgConfig]]:
+        """Find all destinations a package with the given name was added to"""
+        if self._pkg_locations is None:
+            self._pkg_locations = {}
+
+            for dest in self._config.destinations:
+                for pkg in self._config.packages.get(dest.name, []):
+                    self._pkg_locations.setdefault(pkg.name, []).append(
+                        (dest, pkg)
+                    )
+
+        return [*self._pkg_locations.get(pkg_name, [])]
+
     def add_destination(self, name: str, path: Path) -> Destination:
         """Register a new destination"""
 
         if re.match(_NAME_REGEX, name) is None:
             raise NameInvalidError(name)
 
-        for dest in self._config.destinations:
-            if dest.name == name:
-                raise DestinationWithNameAlreadyExistsError(name)
+        if name in self._destinations_by_name:
+            raise DestinationWithNameAlreadyExistsError(name)
 
-            if path.absolute() == Path(dest.path).absolute():
-                raise DestinationWithPathAlreadyExistsError(path)
+        # destination paths are stored relative to the project root
+        if path.absolute() in self._destination_paths:
+            raise DestinationWithPathAlreadyExistsError(path)
 
         dest = Destination(
             name,
             str(path.relative_to(self.project_root_directory())),
         )
 
-        logging.debug(f"Added new destination: {dest}")
+        logging.debug("Added new destination: %s", dest)
 
         self._config.destinations.append(dest)
+        self._destinations_by_name[dest.name] = dest
+        self._destination_paths.add(self._project_root / dest.path)
+        self._pkg_locations = None
         self._write_config()
 
         return dest
@@ -96,7 +159,7 @@ class PkgManager:
         """Is the given package registered at destination?"""
         if isinstance(pkg, PkgConfig):
             pkg = pkg.name
-        return self.find_package(destination, pkg) is not None
+        return pkg in self._packages_by_name.get(destination.name, ())
 
     def package_stats(
         self, destination: Destination, pkg: PkgConfig
@@ -108,12 +171,11 @@ class PkgManager:
             return None
 
         try:
-            pkg_repo = Repo(submodule_location)
+            # closing the repo also stops its git cat-file process
+            with Repo(submodule_location) as pkg_repo:
+                commit = pkg_repo.head.commit
 
-            return PkgStats(
-                pkg_repo.head.commit.hexsha,
-                pkg_repo.head.commit.committed_datetime,
-            )
+                return PkgStats(commit.hexsha, commit.committed_datetime)
         except ValueError:
             return None
 
@@ -126,34 +188,31 @@ class PkgManager:
         if self.is_package_registered(destination, pkg):
             raise PkgHasAlreadyBeenAddedError(destination, pkg)
 
-        logging.debug(f"adding package {pkg} to dest: {destination}")
+        logging.debug("adding package %s to dest: %s", pkg, destination)
 
         if destination.name not in self._config.packages:
             self._config.packages[destination.name] = []
+            self._packages_by_name[destination.name] = {}
 
         self._config.packages[destination.name].append(pkg)
+        self._packages_by_name[destination.name][pkg.name] = pkg
+        self._pkg_locations = None
         self._write_config()
 
     def remove_package(self, destination: Destination, pkg: PkgConfig) -> None:
         """Remove package from destination in config
         (does not uninstall package)"""
 
-        if not self.is_package_registered(destination, pkg):
-            raise UnknownPackageError(destination, pkg)
-
-        logging.debug(f"removing package {pkg} from dest: {destination}")
-
-        index = -1
-
-        for idx, p in enumerate(self._config.packages[destination.name]):
-            if pkg.name == p.name:
-                index = idx
-                break
+        ref_pkg = self.find_package(destination, pkg.name)
 
-        if index == -1:
+        if ref_pkg is None:
             raise UnknownPackageError(destination, pkg)
 
-        del self._config.packages[destination.name][index]
+        logging.debug("removing package %s from dest: %s", pkg, destination)
+
+        self._config.packages[destination.name].remove(ref_pkg)
+        del self._packages_by_name[destination.name][pkg.name]
+        self._pkg_locations = None
         self._write_config()
 
     def is_package_installed(
@@ -166,12 +225,29 @@ class PkgManager:
         if not self.is_package_registered(destination, pkg):
             return False
 
+        return self._is_package_on_disk(destination, pkg)
+
+    def _is_package_on_disk(
+        self,
+        destination: Destination,
+        pkg: PkgConfig,
+    ) -> bool:
+        """Are all parts of a registered package present on disk?"""
+        if self._gitpkgs_children is None:
+            try:
+                self._gitpkgs_children = {
+                    path.name for path in self._gitpkgs_dir.iterdir()
+                }
+            except FileNotFoundError:
+                self._gitpkgs_children = set()
+
         return (
-            (self.project_root_directory() / ".gitmodules").exists()
+            self._gitmodules_file.exists()
+            and self.package_identifier(destination, pkg)
+            in self._gitpkgs_children
             and does_actually_exist(
                 self.package_install_location(destination, pkg)
             )
-            and self._get_pkg_submodule_location(destination, pkg).exists()
             and self._gitmodules_internal_location(destination, pkg).exists()
         )
 
@@ -179,12 +255,7 @@ class PkgManager:
         self, destination: Destination, pkg_name: str
     ) -> PkgConfig | None:
         """Find a package in a destination by name"""
-        if destination.name not in self._config.packages:
-            return None
-        for pkg in self._config.packages[destination.name]:
-            if pkg.name == pkg_name:
-                return pkg
-        return None
+        return self._packages_by_name.get(destination.name, {}).get(pkg_name)
 
     def has_package_config_been_changed(
         self, destination: Destination, pkg: PkgConfig
@@ -195,13 +266,26 @@ class PkgManager:
         if ref_pkg is None:
             raise UnknownPackageError(destination, pkg)
 
+        return self._has_package_config_changed(destination, ref_pkg, pkg)
+
+    def _has_package_config_changed(
+        self, destination: Destination, ref_pkg: PkgConfig, pkg: PkgConfig
+    ) -> bool:
+        """Compare package configuration against the registered one"""
         if ref_pkg.url != pkg.url:
             raise PackageUrlChangedError(destination, ref_pkg, pkg)
 
+        # install methods are compared resolved, unset means link
         config_changed = (
-            ref_pkg.package_root != pkg.package_root
-            or ref_pkg.updates_disabled != pkg.updates_disabled
-            or ref_pkg.branch != pkg.branch
+            ref_pkg.package_root,
+            ref_pkg.updates_disabled,
+            ref_pkg.branch,
+            ref_pkg.get_install_method(),
+        ) != (
+            pkg.package_root,
+            pkg.updates_disabled,
+            pkg.branch,
+            pkg.get_install_method(),
         )
 
         if config_changed:
@@ -218,31 +302,37 @@ class PkgManager:
             ref_repo = Repo(self._get_pkg_submodule_location(destination, pkg))
             if pkg.branch != ref_repo.active_branch.name:
                 logging.debug(
-                    f"package has changed! repo branch is: "
-                    f"{ref_repo.active_branch.name}, but package "
-                    f"wanted: {pkg.branch}"
+                    "package has changed! repo branch is: %s, "
+                    "but package wanted: %s",
+                    ref_repo.active_branch.name,
+                    pkg.branch,
                 )
                 return True
 
         pkg_path = self.package_install_location(destination, pkg)
+        install_method = pkg.get_install_method()
+
+        # one lstat for all checks below, links are not followed
+        try:
+            pkg_path_exists = True
+            pkg_path_is_link = stat.S_ISLNK(pkg_path.lstat().st_mode)
+        except FileNotFoundError:
+            pkg_path_exists = False
+            pkg_path_is_link = False
 
         # was installed as link but is now copy
-        if pkg.get_install_method() == InstallMethod.COPY and is_symlink(
-            pkg_path
-        ):
+        if install_method == InstallMethod.COPY and pkg_path_is_link:
             return True
 
         # was installed as copy and is now link
-        if pkg.get_install_method() == InstallMethod.LINK and not is_symlink(
-            pkg_path
-        ):
+        if install_method == InstallMethod.LINK and not pkg_path_is_link:
             return True
 
         # check if contents of directories are different
         if (
-            pkg.get_install_method() == InstallMethod.COPY
+            install_method == InstallMethod.COPY
             and pkg.package_root
-            and does_actually_exist(pkg_path)
+            and pkg_path_exists
         ):
             source_path = (
                 self._get_pkg_submodule_location(destination, pkg)
@@ -264,7 +354,7 @@ class PkgManager:
                 return len(result.funny_files) > 0
 
         # check if package root is different in a link setting
-        if pkg.package_root and is_symlink(pkg_path):
+        if pkg.package_root and pkg_path_is_link:
             source_path = (
                 self._get_pkg_submodule_location(destination, pkg)
                 / pkg.package_root
@@ -274,40 +364,82 @@ class PkgManager:
             # this path should be relative, so we apply it on top of the install
             # location
             if not target_path.is_absolute():
-                vendor_dir = self.package_install_location(
-                    destination, pkg
-                ).parent
-                target_path = vendor_dir / target_path
+                target_path = pkg_path.parent / target_path
 
-            # link target does not exist? Something changed!
-            if not source_path.exists() or not target_path.exists():
+            # package root does not exist? Something changed!
+            if not source_path.exists():
                 return True
 
             logging.debug(
-                f"package root: Source is {source_path}, "
-                f"Target is: {target_path}"
+                "package root: Source is %s, Target is: %s",
+                source_path,
+                target_path,
+            )
+
+            # both are anchored at the project root, comparing the normalized
+            # paths avoids stat-ing them again
+            return os.path.normpath(source_path) != os.path.normpath(
+                target_path
             )
-            return not source_path.samefile(target_path)
 
         return False
 
     def install_package(self, destination: Destination, pkg: PkgConfig) -> None:
         """Install the package to the disk"""
+        with self.batch():
+            self._cleanup_install()
+            self._install_package(destination, pkg)
+
+    def install_packages(
+        self, packages: Iterable[tuple[Destination, PkgConfig]]
+    ) -> Iterator[tuple[Destination, PkgConfig, bool]]:
+        """Install multiple packages to the disk, yields the destination,
+        package and whether it was installed or had already been installed"""
         self._cleanup_install()
 
-        if not self.is_package_registered(destination, pkg):
+        has_any_pkg_changed = False
+
+        try:
+            for destination, pkg in packages:
+                try:
+                    has_any_pkg_changed |= self._install_package(
+                        destination, pkg
+                    )
+                except PackageAlreadyInstalledError:
+                    yield destination, pkg, False
+                    continue
+
+                yield destination, pkg, True
+        finally:
+            # replaced packages might have left their old checkout behind,
+            # this has to happen even if a later package failed to install
+            if has_any_pkg_changed:
+                self._cleanup_install()
+
+    def _install_package(
+        self, destination: Destination, pkg: PkgConfig
+    ) -> bool:
+        """Install the package to the disk without cleaning up first, returns
+        whether an existing package was replaced with new settings"""
+        ref_pkg = self.find_package(destination, pkg.name)
+
+        if ref_pkg is None:
             self.add_package(destination, pkg)
+            ref_pkg = pkg
 
-        has_pkg_changed = self.has_package_config_been_changed(destination, pkg)
+        has_pkg_changed = self._has_package_config_changed(
+            destination, ref_pkg, pkg
+        )
 
         if has_pkg_changed:
-            logging.debug(f"replace package with new settings {pkg}")
+            logging.debug("replace package with new settings %s", pkg)
             self.remove_package(destination, pkg)
             self.add_package(destination, pkg)
-
-        if not has_pkg_changed and self.is_package_installed(destination, pkg):
+        elif self._is_package_on_disk(destination, pkg):
             raise PackageAlreadyInstalledError(destination, pkg)
 
+        self._gitpkgs_children = None
+
         repo_used_by_other_pkg = self._repo_used_by_other_pkg(destination, pkg)
 
         submodule_location = self._get_pkg_submodule_location(destination, pkg)
@@ -318,20 +450,36 @@ class PkgManager:
         submodule_location.parent.mkdir(parents=True, exist_ok=True)
         install_dir.parent.mkdir(parents=True, exist_ok=True)
 
+        link_target = os.path.relpath(pkg_package_root_dir, install_dir.parent)
+
+        # keep an existing link if it already points to the package root
+        keep_link = (
+            pkg.get_install_method() == InstallMethod.LINK
+            and is_symlink(install_dir)
+            and str(install_dir.readlink()) == link_target
+        )
+
         # delete if install dir is there (missing links are exists = False)
-        safe_dir_delete(install_dir)
+        if not keep_link:
+            safe_dir_delete(install_dir)
 
-        if not repo_used_by_other_pkg and submodule_location.exists():
+        submodule_exists = submodule_location.exists()
+
+        if not repo_used_by_other_pkg and submodule_exists:
             safe_dir_delete(submodule_location)
+            submodule_exists = False
 
-        gitmodules_file = self.project_root_directory() / ".gitmodules"
+        gitmodules_file = self._gitmodules_file
 
         internal_dir = self._gitmodules_internal_location(destination, pkg)
-        if internal_dir.exists() and not gitmodules_file.exists():
+        internal_dir_exists = internal_dir.exists()
+
+        if internal_dir_exists and not gitmodules_file.exists():
             safe_dir_delete(internal_dir)
+            internal_dir_exists = False
 
-        if not submodule_location.exists():
-            if internal_dir.exists():
+        if not submodule_exists:
+            if internal_dir_exists:
                 Repo.clone_from(internal_dir, submodule_location)
 
                 gitdir = submodule_location / ".git"
@@ -355,7 +503,7 @@ class PkgManager:
         if not pkg_package_root_dir.exists():
             raise PackageRootDirNotFoundError(pkg, pkg_package_root_dir)
 
-        if does_actually_exist(install_dir):
+        if not keep_link and does_actually_exist(install_dir):
             install_dir.unlink()
 
         match pkg.get_install_method():
@@ -363,21 +511,22 @@ class PkgManager:
                 if is_windows():
                     msg = "Install method 'link' is not supported on Windows!"
                     raise NotSupportedByPlatformError(msg)
-                install_dir.symlink_to(
-                    os.path.relpath(pkg_package_root_dir, install_dir.parent)
-                )
+                if not keep_link:
+                    install_dir.symlink_to(link_target)
             case InstallMethod.COPY:
-                shutil.copytree(pkg_package_root_dir, install_dir)
+                copy_tree(pkg_package_root_dir, install_dir)
             case method:
                 msg = f"Unknown install method {method}"
                 raise ValueError(msg)
 
-        logging.debug(f"installed package '{pkg.name}' to {install_dir}")
+        logging.debug("installed package '%s' to %s", pkg.name, install_dir)
+        return has_pkg_changed
 
     def uninstall_package(
         self, destination: Destination, pkg: PkgConfig
     ) -> None:
         """Uninstalls the package from disk"""
+        self._gitpkgs_children = None
 
         repo_used_by_other_pkg = self._repo_used_by_other_pkg(destination, pkg)
 
@@ -400,8 +549,9 @@ class PkgManager:
             self.remove_package(destination, pkg)
 
         logging.debug(
-            f"uninstalled package '{pkg.name}' from dest: "
-            f"'{destination.name}'"
+            "uninstalled package '%s' from dest: '%s'",
+            pkg.name,
+            destination.name,
         )
 
     def update_package(
@@ -452,14 +602,14 @@ class PkgManager:
             if pkg.get_install_method() == InstallMethod.COPY:
                 install_dir = self.package_install_location(destination, pkg)
                 safe_dir_delete(install_dir)
-                shutil.copytree(submodule_location, install_dir)
+                copy_tree(submodule_location, install_dir)
 
             return PkgUpdateResult.UPDATED
 
         return PkgUpdateResult.NO_UPDATE_AVAILABLE
 
     def _cleanup_install(self) -> None:
-        gitmodules_file = self.project_root_directory() / ".gitmodules"
+        self._gitpkgs_children = None
         section_regex = r"submodule \"(.+)\""
 
         packages = []
@@ -476,7 +626,7 @@ class PkgManager:
         for dir in self._gitpkgs_location().glob("*"):
             if dir.name in packages:
                 continue
-            logging.debug(f"CLEAN: remove unused gitpkg {dir}")
+            logging.debug("CLEAN: remove unused gitpkg %s", dir)
             safe_dir_delete(dir)
 
         # remove links that point nowhere from dest dirs
@@ -488,14 +638,12 @@ class PkgManager:
                     continue
                 target_dir = (dest_dir.parent / dest_dir.readlink()).resolve()
                 if not does_actually_exist(target_dir):
-                    logging.debug(f"CLEAN: remove symlink {dest_dir}")
+                    logging.debug("CLEAN: remove symlink %s", dest_dir)
                     dest_dir.unlink()
 
-        if not gitmodules_file.exists():
-            return
-
-        with GitConfigParser(gitmodules_file, read_only=False) as cp:
-            cp.read()
+        with self._gitmodules_session() as cp:
+            if cp is None:
+                return
 
             outdated_sections = []
 
@@ -528,19 +676,13 @@ class PkgManager:
 
                 pkg_ident = matches[0]
 
-                internal_dir = (
-                    self.project_root_directory()
-                    / ".git"
-                    / "modules"
-                    / pkg_ident
-                )
+                internal_dir = self._git_modules_dir / pkg_ident
 
                 if internal_dir.exists():
-                    logging.debug(f"CLEAN: remove internal dir {internal_dir}")
+                    logging.debug("CLEAN: remove internal dir %s", internal_dir)
                     safe_dir_delete(internal_dir)
 
                 cp.remove_section(section)
-            cp.write()
 
     def _repo_used_by_other_pkg(
         self, dest: Destination, pkg: PkgConfig
@@ -564,49 +706,103 @@ class PkgManager:
     ) -> None:
         """Remove package entry from the .gitmodules file"""
         pkg_ident = self.package_identifier(destination, pkg)
-        gitmodules_file = self.project_root_directory() / ".gitmodules"
         section = f'submodule "{pkg_ident}"'
 
-        if gitmodules_file.exists():
-            with GitConfigParser(gitmodules_file, read_only=False) as cp:
-                cp.read()
-                cp.remove_section(section)
-                cp.write()
+        gitmodules_file = self._gitmodules_file
+        lock_file = gitmodules_file.with_name(f"{gitmodules_file.name}.lock")
+
+        # take the lock the way git and GitPython do, the new content is
+        # written to the lock file and then moved in place
+        try:
+            lock = lock_file.open("x")
+        except FileExistsError:
+            msg = f"Lock for file {gitmodules_file} does already exist"
+            raise OSError(msg) from None
+
+        try:
+            with lock:
+                try:
+                    text = gitmodules_file.read_text()
+                except FileNotFoundError:
+                    return
+
+                # cut from the section header up to the next header (or the
+                # end), the leading newline lets a header on the first line
+                # match too
+                padded = f"\n{text}"
+                start = padded.find(f"\n[{section}]")
+
+                if start != -1:
+                    end = padded.find("\n[", start + 1)
+                    rest = padded[end:] if end != -1 else "\n"
+                    text = f"{padded[:start]}{rest}"[1:]
+
+                # remove .gitmodules file if empty
+                if len(text.strip()) == 0:
+                    gitmodules_file.unlink()
+                    return
 
-            # remove .gitmodules file if empy
-            text = gitmodules_file.read_text()
-            if len(text.strip()) == 0:
-                gitmodules_file.unlink()
+                if start == -1:
+                    return
+
+                lock.write(text)
+
+            lock_file.replace(gitmodules_file)
+        finally:
+            lock_file.unlink(missing_ok=True)
 
     def _update_gitmodules_file(
         self, destination: Destination, pkg: PkgConfig
     ) -> None:
         pkg_ident = self.package_identifier(destination, pkg)
-        gitmodules_file = self.project_root_directory() / ".gitmodules"
         section = f'submodule "{pkg_ident}"'
 
-        if gitmodules_file.exists():
-            with GitConfigParser(gitmodules_file, read_only=False) as cp:
-                cp.read()
+        with self._gitmodules_session() as cp:
+            if cp is not None:
                 cp.set(section, "update", "none")
-                cp.write()
+
+    @contextmanager
+    def _gitmodules_session(self) -> Iterator[GitConfigParser | None]:
+        """Open and parse .gitmodules for the edits made inside of the session,
+        yields None if there is no .gitmodules file"""
+        gitmodules_file = self._gitmodules_file
+
+        if not gitmodules_file.exists():
+            yield None
+            return
+
+        with GitConfigParser(gitmodules_file, read_only=False) as cp:
+            cp.read()
+            yield cp
+            # write explicitly, release() swallows errors while writing
+            cp.write()
+            is_empty = len(cp.sections()) == 0
+
+        # remove .gitmodules file if empty
+        if is_empty:
+            gitmodules_file.unlink()
 
     def _write_config(self) -> None:
         """Persist config file to disk"""
-        logging.debug(f"Written to config file: {self.config_file()}")
-        self.config_file().write_text(self._config.to_toml_string())
+        if self._batch_depth > 0:
+            self._config_dirty = True
+            return
+
+        self._config_dirty = False
+        logging.debug("Written to config file: %s", self.config_file())
+        write_text_atomic(self.config_file(), self._config.to_toml_string())
 
     def project_root_directory(self) -> Path:
         """Root directory of the project repository"""
-        return PkgManager._project_root_directory(self._repo)
+        return self._project_root
 
     def config_file(self) -> Path:
         """Location of the git pkg config file"""
-        return self.project_root_directory() / _CONFIG_FILE
+        return self._config_file
 
     def _gitpkgs_location(self) -> Path:
         """Location of the directory where the submodules are stored"""
-        return self.project_root_directory() / _GITPKGS_DIR
+        return self._gitpkgs_dir
 
     def package_install_location(
         self,
@@ -628,44 +824,43 @@ class PkgManager:
 
     def package_identifier(self, _dest: Destination, pkg: PkgConfig) -> str:
         """Unique package identifier"""
-        hasher = hashlib.sha3_256()
-        hasher.update(
-            "::".join(
-                filter(
-                    lambda elem: elem is not None,
-                    [
-                        "gitpkg",
-                        pkg.url,
-                        pkg.branch,
-                    ],
-                )
-            ).encode("utf8")
-        )
+        key = (pkg.url, pkg.branch)
+
+        if key in self._ident_cache:
+            return self._ident_cache[key]
+
+        ident_str = f"gitpkg::{pkg.url}"
+
+        if pkg.branch is not None:
+            ident_str += f"::{pkg.branch}"
+
+        # sha3 is kept on purpose, the identifier names the directories in
+        # .gitpkgs and the submodules in .gitmodules of existing projects
+        digest = hashlib.sha3_256(ident_str.encode("utf8")).hexdigest()
         # TODO: properly parse ident
         reponame = extract_repository_name_from_url(pkg.url)
-        return f"{reponame}_{hasher.hexdigest()[0:7]}"
+        ident = f"{reponame}_{digest[0:7]}"
+        self._ident_cache[key] = ident
+        return ident
 
     def _gitmodules_internal_location(
         self, destination: Destination, pkg: PkgConfig
     ) -> Path:
         """Git internal location for the submodule"""
-        return (
-            self.project_root_directory()
-            / ".git"
-            / "modules"
-            / self.package_identifier(destination, pkg)
-        )
+        return self._git_modules_dir / self.package_identifier(destination, pkg)
 
     @staticmethod
-    def from_environment() -> PkgManager:
+    def from_environment(cwd: Path | None = None) -> PkgManager:
         """Create a package manager for the nearest git project"""
-        repo = Repo(Path.cwd(), search_parent_directories=True)
+        repo = Repo(cwd or Path.cwd(), search_parent_directories=True)
         config = Config()
 
         config_file = PkgManager._project_root_directory(repo) / _CONFIG_FILE
 
         if config_file.exists():
-            config = Config.from_path(config_file)
+            config = Config.from_path(
+                config_file, Path(repo.git_dir) / _CONFIG_CACHE_FILE
+            )
 
         return PkgManager(repo, config)
 
@@ -681,7 +876,9 @@ class PkgManager:
         config_file = PkgManager._project_root_directory(repo) / _CONFIG_FILE
 
         if config_file.exists():
-            config = Config.from_path(config_file)
+            config = Config.from_path(
+                config_file, Path(repo.git_dir) / _CONFIG_CACHE_FILE
+            )
 
         return PkgManager(repo, config)
 
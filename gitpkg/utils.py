@@ -1,48 +1,94 @@
+import os
 import re
+import shutil
+import stat
 import sys
+import tempfile
+from functools import lru_cache
 from pathlib import Path
 
-import git
-
-_REPOSITORY_PARSE_REGEX = [
-    r"ssh://(?P<domain>.+)/(?P<owner>.+)/(?P<repo>.+).git",
-    r"git://(?P<domain>.+)/(?P<owner>.+)/(?P<repo>.+).git",
-    r"git@(?P<domain>.+):(?P<owner>.+)/(?P<repo>.+).git",
-    r"https?://(?P<domain>.+)/(?P<owner>.+)/(?P<repo>.+).git",
-    r"https?://(?P<domain>.+)/(?P<owner>.+)/(?P<repo>.+)",
-]
-
-
-def parse_repository_url(url: str) -> tuple[str, str] | None:
-    for regex in _REPOSITORY_PARSE_REGEX:
-        res = re.findall(regex, url)
-        if res:
-            _, _, name = res[0]
-            return url, name
-    p = Path(url)
+# one alternative per supported URL shape, the repository name is always the
+# last group of an alternative (group names have to be unique)
+_REPOSITORY_PARSE_REGEX = re.compile(
+    r"ssh://(?P<domain1>.+)/(?P<owner1>.+)/(?P<repo1>.+).git"
+    r"|git://(?P<domain2>.+)/(?P<owner2>.+)/(?P<repo2>.+).git"
+    r"|git@(?P<domain3>.+):(?P<owner3>.+)/(?P<repo3>.+).git"
+    r"|https?://(?P<domain4>.+)/(?P<owner4>.+)/(?P<repo4>.+).git"
+    r"|https?://(?P<domain5>.+)/(?P<owner5>.+)/(?P<repo5>.+)"
+)
+
+
+def parse_repository_url(
+    url: str, cwd: Path | None = None
+) -> tuple[str, str] | None:
+    match = _REPOSITORY_PARSE_REGEX.search(url)
+    if match:
+        return url, match.group(match.lastgroup)
+    # remote URLs the regex rejects can't be local paths, skip the stat
+    if "://" in url:
+        return None
+    # local paths are relative to cwd if given, to the process otherwise,
+    # joined paths are normalized to keep "../" out of the stored URL
+    p = Path(url) if cwd is None else Path(os.path.normpath(cwd / url))
     if p.exists():
         return str(p.as_posix()), p.name.removesuffix(".git")
     return None
 
 
+@lru_cache(maxsize=128)
 def extract_repository_name_from_url(url: str) -> str:
+    name = _repository_name_fast_path(url)
+    if name is not None:
+        return name
     _, name = parse_repository_url(url)
     return name
 
 
+def _repository_name_fast_path(url: str) -> str | None:
+    """Repository name of plain remote URLs without running the regex, None
+    if the URL needs the regex. The name is part of the package identifier,
+    so this only covers URLs for which the regex gives the same result."""
+    scheme, sep, rest = url.partition("://")
+    domain, _, path = rest.partition("/")
+
+    # "." in the regex does not match newlines
+    if not sep or not domain or "\n" in url:
+        return None
+
+    stem = path.removesuffix(".git")
+
+    # the regex only accepts ssh:// and git:// URLs ending in .git
+    if scheme not in ("http", "https") and stem == path:
+        return None
+
+    if scheme not in ("ssh", "git", "http", "https"):
+        return None
+
+    # the regex accepts any character in front of "git" as ".git", so any
+    # other "git" in the path could end the name early
+    if "git" in stem or "/" not in stem or not all(stem.split("/")):
+        return None
+
+    return stem.rpartition("/")[2]
+
+
 def does_actually_exist(path: Path) -> bool:
-    try:
-        path.lstat()
-    except FileNotFoundError:
-        return False
-    return True
+    # unlike Path.exists this does not follow links, so dangling links count
+    return os.path.lexists(path)
 
 
 def is_symlink(path: Path) -> bool:
-    return does_actually_exist(path) and path.is_symlink()
+    try:
+        return stat.S_ISLNK(path.lstat().st_mode)
+    except FileNotFoundError:
+        return False
 
 
 def safe_dir_delete(path: Path) -> None:
+    # GitPython is expensive to import and only needed for its rmtree
+    # (which handles read-only git objects on Windows)
+    import git
+
     if not does_actually_exist(path):
         return
 
@@ -53,5 +99,78 @@ def safe_dir_delete(path: Path) -> None:
     git.rmtree(path)
 
 
+def write_text_atomic(path: Path, text: str) -> None:
+    """Write text to a temporary file next to path and move it in place, so
+    readers never see a partially written file"""
+    # replace the file a link points to instead of the link itself
+    path = path.resolve()
+
+    try:
+        mode = stat.S_IMODE(path.stat().st_mode)
+    except FileNotFoundError:
+        mode = 0o666 & ~_umask()
+
+    fd, tmp_name = tempfile.mkstemp(
+        dir=path.parent, prefix=f".{path.name}.", suffix=".tmp"
+    )
+    tmp_path = Path(tmp_name)
+
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(text)
+        # mkstemp creates the file as 0600, keep the mode of the old file
+        tmp_path.chmod(mode)
+        tmp_path.replace(path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+def _umask() -> int:
+    # the umask can only be read by setting it
+    umask = os.umask(0o022)
+    os.umask(umask)
+    return umask
+
+
+# ioctl request to share the extents of one file with another (linux/fs.h)
+_FICLONE = 0x40049409
+
+
+def copy_tree(src: Path, dst: Path) -> None:
+    """shutil.copytree that clones files instead of copying their contents
+    on filesystems with copy-on-write support (btrfs, xfs), elsewhere it is
+    a regular copy"""
+    if sys.platform != "linux":
+        shutil.copytree(src, dst)
+        return
+
+    import fcntl
+
+    # stop trying after the first failure, the whole tree is usually on the
+    # same filesystem
+    can_clone = True
+
+    def clone_file(src_file: str, dst_file: str) -> str:
+        nonlocal can_clone
+
+        if can_clone:
+            try:
+                with (
+                    Path(src_file).open("rb") as fsrc,
+                    Path(dst_file).open("wb") as fdst,
+                ):
+                    fcntl.ioctl(fdst.fileno(), _FICLONE, fsrc.fileno())
+            except OSError:
+                can_clone = False
+            else:
+                shutil.copystat(src_file, dst_file)
+                return dst_file
+
+        return shutil.copy2(src_file, dst_file)
+
+    shutil.copytree(src, dst, copy_function=clone_file)
+
+
 def is_windows() -> bool:
     return sys.platform == "win32"
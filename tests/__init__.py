@@ -1,9 +1,45 @@
 import os
+import tempfile
+from pathlib import Path
 
 from tests.git_composer import GitComposer
 
+_GIT_CONFIG = """\
+[user]
+    name = gitpkg
+    email = gitpkg@example.com
+[commit]
+    gpgsign = false
+"""
+
+_GIT_ENV = ("GIT_CONFIG_GLOBAL", "GIT_CONFIG_NOSYSTEM")
+
+_previous_git_env: dict[str, str | None] = {}
+
+
+def setup_module():
+    # keep the user's git config out of the tests, this also spares git and
+    # GitPython from reading it over and over again
+    config_dir = Path(tempfile.mkdtemp(prefix="gitpkg_gitconfig_"))
+    GitComposer.to_be_deleted.append(config_dir)
+
+    config_file = config_dir / "gitconfig"
+    config_file.write_text(_GIT_CONFIG)
+
+    for name in _GIT_ENV:
+        _previous_git_env[name] = os.environ.get(name)
+
+    os.environ["GIT_CONFIG_GLOBAL"] = str(config_file)
+    os.environ["GIT_CONFIG_NOSYSTEM"] = "1"
+
 
 def teardown_module():
+    for name, value in _previous_git_env.items():
+        if value is None:
+            os.environ.pop(name, None)
+        else:
+            os.environ[name] = value
+
     if os.environ.get("GITPKG_DEBUG") is not None:
         return
     GitComposer.cleanup()
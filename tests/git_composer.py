@@ -1,9 +1,14 @@
 from __future__ import annotations
 
 import hashlib
+import os
 import random
+import secrets
+import shutil
+import sys
 import tempfile
-from hashlib import sha3_256
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import ClassVar
 
@@ -11,12 +16,19 @@ from git import Repo
 
 from gitpkg.utils import safe_dir_delete
 
+_GITDIR_PREFIX = b"gitdir: "
+
 
 class GitComposer:
     temp_dir: Path
 
     to_be_deleted: ClassVar[list[Path]] = []
 
+    # every repository starts with the same history, it is built once and
+    # copied instead of being committed again for each repository
+    _template: ClassVar[Path | None] = None
+    _template_lock: ClassVar[threading.Lock] = threading.Lock()
+
     def setup(self, prefix_extra: str = ""):
         if len(prefix_extra) > 0:
             prefix_extra += "_"
@@ -29,8 +41,33 @@ class GitComposer:
     def teardown(self):
         GitComposer.to_be_deleted.append(self.temp_dir)
 
+    def discard(self, path: Path):
+        # moving the path out of the way is a single rename, the contents are
+        # deleted together with the temp dir
+        if not path.exists():
+            return
+
+        trash = Path(tempfile.mkdtemp(prefix="trash_", dir=self.temp_dir))
+        path.rename(trash / path.name)
+
     def create_repository(self, name: str) -> GitComposerRepo:
         repo_path = self.temp_dir / name
+        shutil.copytree(GitComposer._template_repository(), repo_path)
+        return GitComposerRepo(Repo(repo_path), repo_path)
+
+    @staticmethod
+    def _template_repository() -> Path:
+        with GitComposer._template_lock:
+            if GitComposer._template is None:
+                GitComposer._template = GitComposer._create_template()
+            return GitComposer._template
+
+    @staticmethod
+    def _create_template() -> Path:
+        template_dir = Path(tempfile.mkdtemp(prefix="gitpkg_template_"))
+        GitComposer.to_be_deleted.append(template_dir)
+
+        repo_path = template_dir.resolve() / "repo"
         repo = GitComposerRepo(Repo.init(repo_path), repo_path)
 
         repo.new_file("test.txt")
@@ -38,12 +75,20 @@ class GitComposer:
         repo.new_file("test2.txt")
         repo.change_file("test2.txt")
 
-        return repo
+        return repo_path
 
     @staticmethod
     def cleanup():
-        for directory in GitComposer.to_be_deleted:
-            safe_dir_delete(directory)
+        if len(GitComposer.to_be_deleted) == 0:
+            return
+
+        # rmtree spends most of its time in syscalls, which release the GIL
+        workers = min(8, len(GitComposer.to_be_deleted))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(safe_dir_delete, GitComposer.to_be_deleted))
+
+        GitComposer.to_be_deleted.clear()
+        GitComposer._template = None
 
     def __str__(self) -> str:
         return f"GitComposer ({self.temp_dir})"
@@ -65,8 +110,11 @@ class GitComposerRepo:
 
         filepath.parent.mkdir(exist_ok=True, parents=True)
 
-        lines = [_random_str() for _ in range(100)]
-        filepath.write_text("\n".join(lines))
+        # 100 lines of 64 random hex characters, generated in one go
+        data = secrets.token_hex(100 * 32)
+        filepath.write_text(
+            "\n".join(data[i : i + 64] for i in range(0, len(data), 64))
+        )
 
         self._repo.index.add(filename)
 
@@ -105,19 +153,33 @@ class GitComposerRepo:
             return False
 
         packages_dir = self._path / ".gitpkgs"
-        git_files = packages_dir.glob("*/.git")
 
-        for git_file in git_files:
-            if git_file.is_dir():
-                continue
+        if not packages_dir.is_dir():
+            return False
 
-            data = git_file.read_text()
+        with os.scandir(packages_dir) as entries:
+            # entry types come from the directory listing, no stat needed
+            package_dirs = [Path(e.path) for e in entries if e.is_dir()]
 
-            if not data.startswith("gitdir: "):
+        for package_dir in package_dirs:
+            git_file = package_dir / ".git"
+
+            try:
+                data = git_file.read_bytes()
+            except (FileNotFoundError, IsADirectoryError):
+                continue
+            except PermissionError:
+                # opening a directory raises this on Windows
+                if git_file.is_dir():
+                    continue
+                raise
+
+            if not data.startswith(_GITDIR_PREFIX):
                 raise ValueError(f"Unknown .git file content found: {data}")
 
-            prefix_len = len("gitdir: ")
-            gitdir = git_file.parent / data[prefix_len:]
+            gitdir = git_file.parent / os.fsdecode(
+                data.removeprefix(_GITDIR_PREFIX).rstrip()
+            )
 
             if not gitdir.exists():
                 return True
@@ -128,12 +190,14 @@ class GitComposerRepo:
 
 
 def _random_str() -> str:
-    hasher = sha3_256()
-    hasher.update(str(random.randint(0, 1000000)).encode("utf-8"))
-    return hasher.hexdigest()
+    return secrets.token_hex(32)
 
 
 def checksum(filepath: Path) -> str:
-    hasher = hashlib.sha3_256()
-    hasher.update(filepath.read_bytes())
-    return hasher.hexdigest()
+    with filepath.open("rb") as f:
+        if sys.version_info >= (3, 11):
+            return hashlib.file_digest(f, "sha3_256").hexdigest()
+
+        hasher = hashlib.sha3_256()
+        hasher.update(f.read())
+        return hasher.hexdigest()  # pragma: no cover
@@ -1,15 +1,18 @@
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
 from pathlib import Path
 
 import pytest
+from git import Repo
 
 from gitpkg.errors import (
     AmbiguousDestinationError,
     PackageAlreadyInstalledError,
     PackageRootDirNotFoundError,
 )
-from gitpkg.utils import is_windows, safe_dir_delete
+from gitpkg.utils import is_windows
 
 if sys.version_info < (3, 11):
     import tomli as tomllib  # pragma: no cover
@@ -20,36 +23,39 @@ from _pytest.capture import CaptureFixture
 
 from gitpkg.cli import run_cli as run_cli_raw
 from gitpkg.config import Config
+from gitpkg.pkg_manager import PkgManager
 from tests.git_composer import GitComposer, checksum
 
 
+def _load_toml(toml: Path) -> dict:
+    # the configs are a few hundred bytes, parsing them on every call is
+    # cheaper than any cache that can tell two quick rewrites apart
+    with toml.open("rb") as f:
+        return tomllib.load(f)
+
+
 def assert_toml_dest_exists(toml: Path | dict, name: str) -> None:
     if isinstance(toml, Path):
-        assert toml.exists()
-        toml = tomllib.loads(toml.read_text())
+        toml = _load_toml(toml)
 
     assert "destinations" in toml
     assert len(toml["destinations"]) > 0
-    assert (
-        len(list(filter(lambda d: d["name"] == name, toml["destinations"]))) > 0
-    )
+    assert any(d["name"] == name for d in toml["destinations"])
 
 
 def assert_toml_pkg_exists(toml: Path | dict, dest: str, pkg: str) -> None:
     if isinstance(toml, Path):
-        assert toml.exists()
-        toml = tomllib.loads(toml.read_text())
+        toml = _load_toml(toml)
 
     assert "packages" in toml
     assert dest in toml["packages"]
-    assert (
-        len(list(filter(lambda p: p["name"] == pkg, toml["packages"][dest])))
-        > 0
-    )
+    assert any(p["name"] == pkg for p in toml["packages"][dest])
 
 
-def run_cli(args: list[str]):
+def run_cli(args: list[str], cwd: Path | None = None):
     args = list(map(str, args))
+    if cwd is not None:
+        args = ["-C", str(cwd), *args]
     with pytest.raises(SystemExit) as err:
         run_cli_raw(args)
     if err.value.code != 0:
@@ -68,16 +74,16 @@ class TestCLI:
 
     def test_register_destination(self, capsys: CaptureFixture[str]):
         repo = self._git.create_repository("test_repo")
-        os.chdir(repo.path())
+        cwd = repo.path()
         vendor_dir = repo.path() / "vendor"
         vendor_dir.mkdir(parents=True, exist_ok=True)
 
-        run_cli(["dest", "list"])
+        run_cli(["dest", "list"], cwd)
 
         captured = capsys.readouterr()
         assert "No destinations" in captured.out
 
-        run_cli(["dest", "add", vendor_dir])
+        run_cli(["dest", "add", vendor_dir], cwd)
 
         toml_path = vendor_dir / ".." / ".gitpkg.toml"
 
@@ -85,7 +91,7 @@ class TestCLI:
 
         assert_toml_dest_exists(toml_path, "vendor")
 
-        run_cli(["dest", "list"])
+        run_cli(["dest", "list"], cwd)
         captured = capsys.readouterr()
 
         assert "vendor" in captured.out
@@ -99,15 +105,15 @@ class TestCLI:
         repo = self._git.create_repository("test_repo")
         vendor_dir = repo.path() / "libs"
         vendor_dir.mkdir(parents=True, exist_ok=True)
-        os.chdir(vendor_dir)
-        run_cli(["add", str(remote_repo.path().absolute())])
+        cwd = vendor_dir
+        run_cli(["add", str(remote_repo.path())], cwd)
 
         assert (vendor_dir / "remote_repo").exists()
 
         toml_path = vendor_dir / ".." / ".gitpkg.toml"
 
         assert toml_path.exists()
-        data = tomllib.loads(toml_path.read_text())
+        data = _load_toml(toml_path)
 
         assert_toml_dest_exists(data, "libs")
         assert_toml_pkg_exists(data, "libs", "remote_repo")
@@ -121,28 +127,51 @@ class TestCLI:
         # would fail
         if pkg.get("install-method") != "copy":
             # must be relative path, regression  test for #8
-            remote_repo_install_link = Path(
-                vendor_dir / "remote_repo"
-            ).readlink()
+            remote_repo_install_link = (vendor_dir / "remote_repo").readlink()
             assert not remote_repo_install_link.is_absolute()
             assert (vendor_dir / remote_repo_install_link).exists()
 
         assert not repo.is_corrupted()
 
+    def test_add_package_with_cwd_option(self):
+        remote_repo = self._git.create_repository("remote_repo")
+
+        repo = self._git.create_repository("test_repo")
+        vendor_dir = repo.path() / "libs"
+        vendor_dir.mkdir(parents=True, exist_ok=True)
+
+        cwd = Path.cwd()
+        run_cli(["-C", vendor_dir, "add", "../../remote_repo"])
+
+        assert Path.cwd() == cwd
+        assert (vendor_dir / "remote_repo").exists()
+
+        toml_path = repo.path() / ".gitpkg.toml"
+        data = _load_toml(toml_path)
+
+        assert_toml_dest_exists(data, "libs")
+        assert_toml_pkg_exists(data, "libs", "remote_repo")
+
+        pkg = data["packages"]["libs"][0]
+
+        assert pkg["url"] == remote_repo.path().as_posix()
+        assert not repo.is_corrupted()
+
     def test_add_package_multiple_destinations(self):
         remote_repo = self._git.create_repository("remote_repo")
         remote_repo.new_file("yolo.txt")
+        remote = str(remote_repo.path())
 
         repo = self._git.create_repository("test_repo")
-        os.chdir(repo.path())
+        cwd = repo.path()
 
         libs_dir = repo.path() / "libs"
         libs_dir.mkdir(parents=True, exist_ok=True)
-        run_cli(["dest", "add", "libs"])
+        run_cli(["dest", "add", "libs"], cwd)
 
         vendor_dir = repo.path() / "vendor"
         vendor_dir.mkdir(parents=True, exist_ok=True)
-        run_cli(["dest", "add", "vendor"])
+        run_cli(["dest", "add", "vendor"], cwd)
 
         toml_path = repo.path() / ".gitpkg.toml"
 
@@ -151,23 +180,14 @@ class TestCLI:
 
         # test with no dest should raise error
         with pytest.raises(AmbiguousDestinationError) as err:
-            run_cli(["add", str(remote_repo.path().absolute())])
+            run_cli(["add", remote], cwd)
 
         # installing at both places should work
-        run_cli(
-            ["add", str(remote_repo.path().absolute()), "--dest-name", "libs"]
-        )
+        run_cli(["add", remote, "--dest-name", "libs"], cwd)
         # repo should be there
         assert (libs_dir / "remote_repo").exists()
 
-        run_cli(
-            [
-                "add",
-                str(remote_repo.path().absolute()),
-                "--dest-name",
-                "vendor",
-            ]
-        )
+        run_cli(["add", remote, "--dest-name", "vendor"], cwd)
         # repo should be there
         assert (vendor_dir / "remote_repo").exists()
 
@@ -179,41 +199,28 @@ class TestCLI:
 
         # installing same package again should cause error
         with pytest.raises(PackageAlreadyInstalledError):
-            run_cli(
-                [
-                    "add",
-                    str(remote_repo.path().absolute()),
-                    "--dest-name",
-                    "libs",
-                ]
-            )
+            run_cli(["add", remote, "--dest-name", "libs"], cwd)
 
         with pytest.raises(PackageAlreadyInstalledError):
-            run_cli(
-                [
-                    "add",
-                    str(remote_repo.path().absolute()),
-                    "--dest-name",
-                    "vendor",
-                ]
-            )
+            run_cli(["add", remote, "--dest-name", "vendor"], cwd)
         assert not repo.is_corrupted()
 
     def test_add_package_with_one_destination(self):
         remote_repo = self._git.create_repository("remote_repo")
         remote_repo.new_file("404.txt")
         remote_repo.new_file("subdir/yolo.txt")
+        remote = str(remote_repo.path())
 
         repo = self._git.create_repository("test_repo")
-        os.chdir(repo.path())
+        cwd = repo.path()
 
         vendor_dir = repo.path() / "libs"
         vendor_dir.mkdir(parents=True, exist_ok=True)
-        run_cli(["dest", "add", "libs"])
+        run_cli(["dest", "add", "libs"], cwd)
 
         toml_path = repo.path() / ".gitpkg.toml"
 
-        run_cli(["add", str(remote_repo.path().absolute()), "-r", "subdir"])
+        run_cli(["add", remote, "-r", "subdir"], cwd)
 
         assert_toml_dest_exists(toml_path, "libs")
         assert_toml_pkg_exists(toml_path, "libs", "remote_repo")
@@ -224,14 +231,7 @@ class TestCLI:
 
         # try to install from unknown dest
         with pytest.raises(AmbiguousDestinationError):
-            run_cli(
-                [
-                    "add",
-                    str(remote_repo.path().absolute()),
-                    "--dest-name",
-                    "unknown",
-                ]
-            )
+            run_cli(["add", remote, "--dest-name", "unknown"], cwd)
         assert not repo.is_corrupted()
 
     def test_add_with_non_existent_package_root(self):
@@ -241,11 +241,12 @@ class TestCLI:
         repo = self._git.create_repository("test_repo")
         vendor_dir = repo.path() / "libs"
         vendor_dir.mkdir(parents=True, exist_ok=True)
-        os.chdir(vendor_dir)
+        cwd = vendor_dir
 
         with pytest.raises(PackageRootDirNotFoundError):
             run_cli(
-                ["add", str(remote_repo.path().absolute()), "-rn", "subdir"]
+                ["add", str(remote_repo.path()), "-rn", "subdir"],
+                cwd,
             )
 
         dep_path = vendor_dir / "subdir"
@@ -257,12 +258,12 @@ class TestCLI:
         repo = self._git.create_repository("test_repo")
         vendor_dir = repo.path() / "libs"
         vendor_dir.mkdir(parents=True, exist_ok=True)
-        os.chdir(vendor_dir)
+        cwd = vendor_dir
 
         remote_repo = repo.path().parent / "fake_remote_repo"
 
         with pytest.raises(Exception) as err:
-            run_cli(["add", str(remote_repo.absolute()), "-rn", "subdir"])
+            run_cli(["add", str(remote_repo), "-rn", "subdir"], cwd)
 
         dep_path = vendor_dir / "subdir"
 
@@ -276,16 +277,17 @@ class TestCLI:
         remote_repo.new_file("root_c/c.c")
         remote_repo.new_file("root_d/d.c")
         remote_repo.new_file("root_e/e.c")
+        remote = str(remote_repo.path())
 
         repo = self._git.create_repository("test_repo")
         libs_dir = repo.path() / "libs"
         libs_dir.mkdir(parents=True, exist_ok=True)
-        os.chdir(libs_dir)
-        run_cli(["add", str(remote_repo.path().absolute()), "-rn", "root_a"])
-        run_cli(["add", str(remote_repo.path().absolute()), "-rn", "root_b"])
-        run_cli(["add", str(remote_repo.path().absolute()), "-rn", "root_c"])
-        run_cli(["add", str(remote_repo.path().absolute()), "-rn", "root_d"])
-        run_cli(["add", str(remote_repo.path().absolute()), "-rn", "root_e"])
+        cwd = libs_dir
+        run_cli(["add", remote, "-rn", "root_a"], cwd)
+        run_cli(["add", remote, "-rn", "root_b"], cwd)
+        run_cli(["add", remote, "-rn", "root_c"], cwd)
+        run_cli(["add", remote, "-rn", "root_d"], cwd)
+        run_cli(["add", remote, "-rn", "root_e"], cwd)
 
         toml_path = libs_dir / ".." / ".gitpkg.toml"
 
@@ -309,13 +311,14 @@ class TestCLI:
     def test_add_with_install_method_copy(self):
         remote_repo = self._git.create_repository("remote_repo")
         repo = self._git.create_repository("test_repo")
-        os.chdir(repo.path())
+        cwd = repo.path()
 
-        run_cli(["dest", "add", "libs"])
+        run_cli(["dest", "add", "libs"], cwd)
         libs_dir = repo.path() / "libs"
 
         run_cli(
-            ["add", remote_repo.path().absolute(), "--install-method", "copy"]
+            ["add", remote_repo.path(), "--install-method", "copy"],
+            cwd,
         )
 
         dep = libs_dir / "remote_repo"
@@ -325,35 +328,50 @@ class TestCLI:
         assert not dep.is_symlink()
 
     def test_list_packages(self, capsys: CaptureFixture[str]):
-        deps = []
-
-        for i in range(10):
-            dep = self._git.create_repository(f"dep_{str(i).zfill(3)}")
-            dep.new_file(f"{str(i).zfill(3)}.txt")
+        # copying the repositories is independent filesystem work, committing
+        # is not as GitPython changes the working directory while adding files
+        with ThreadPoolExecutor() as executor:
+            deps = list(
+                executor.map(
+                    self._git.create_repository,
+                    (f"dep_{i:03}" for i in range(10)),
+                )
+            )
 
-            deps.append(dep)
+        for i, dep in enumerate(deps):
+            dep.new_file(f"{i:03}.txt")
 
         repo = self._git.create_repository("test_repo")
 
-        os.chdir(repo.path())
+        cwd = repo.path()
         vendor_dir = repo.path() / "libs"
         vendor_dir.mkdir(parents=True, exist_ok=True)
-        run_cli(["dest", "add", "libs"])
+        run_cli(["dest", "add", "libs"], cwd)
 
-        run_cli(["list"])
+        run_cli(["list"], cwd)
         captured = capsys.readouterr()
 
         assert "No packages" in captured.out
 
         for dep in deps:
-            run_cli(["add", str(dep.path().absolute())])
+            run_cli(["add", str(dep.path())], cwd)
 
-        run_cli(["list"])
+        capsys.readouterr()
+        run_cli(["list"], cwd)
 
         captured = capsys.readouterr()
 
         for dep in deps:
             assert dep.path().name in captured.out
+
+        # piped output is plain tab separated values with a header line
+        lines = captured.out.splitlines()
+        assert lines[0] == "Name\tInstall Dir\tHash\tLast Update"
+        assert len(lines) == len(deps) + 1
+        for line in lines:
+            cells = line.split("\t")
+            assert len(cells) == 4
+            assert all(cell == cell.strip() for cell in cells)
         assert not repo.is_corrupted()
 
     def test_remove(self):
@@ -363,9 +381,9 @@ class TestCLI:
         repo = self._git.create_repository("test_repo")
         vendor_dir = repo.path() / "libs"
         vendor_dir.mkdir(parents=True, exist_ok=True)
-        os.chdir(vendor_dir)
-        run_cli(["add", str(dep_a.path().absolute())])
-        run_cli(["add", str(dep_b.path().absolute())])
+        cwd = vendor_dir
+        run_cli(["add", str(dep_a.path())], cwd)
+        run_cli(["add", str(dep_b.path())], cwd)
 
         toml_path = repo.path() / ".gitpkg.toml"
 
@@ -373,18 +391,46 @@ class TestCLI:
         assert_toml_pkg_exists(toml_path, "libs", "depA")
         assert_toml_pkg_exists(toml_path, "libs", "depB")
 
-        run_cli(["remove", "depA"])
+        run_cli(["remove", "depA"], cwd)
 
-        assert_toml_pkg_exists(toml_path, "libs", "depB")
+        data = _load_toml(toml_path)
 
-        data = tomllib.loads(toml_path.read_text())
+        assert_toml_pkg_exists(data, "libs", "depB")
         packages = data.get("packages", {}).get("libs", [])
 
-        assert (
-            len(list(filter(lambda pkg: pkg["name"] == "depA", packages))) == 0
-        )
+        assert not any(pkg["name"] == "depA" for pkg in packages)
+
+        gitmodules = repo.path() / ".gitmodules"
+
+        assert "depA" not in gitmodules.read_text()
+        assert "depB" in gitmodules.read_text()
+        assert not (repo.path() / ".gitmodules.lock").exists()
         assert not repo.is_corrupted()
 
+    def test_remove_with_locked_gitmodules(self):
+        dep_a = self._git.create_repository("depA")
+        dep_b = self._git.create_repository("depB")
+
+        repo = self._git.create_repository("test_repo")
+        vendor_dir = repo.path() / "libs"
+        vendor_dir.mkdir(parents=True, exist_ok=True)
+        cwd = vendor_dir
+        run_cli(["add", str(dep_a.path())], cwd)
+        run_cli(["add", str(dep_b.path())], cwd)
+
+        gitmodules = repo.path() / ".gitmodules"
+        gitmodules_lock = repo.path() / ".gitmodules.lock"
+        text = gitmodules.read_text()
+
+        # someone else (e.g. git) is editing .gitmodules right now
+        gitmodules_lock.touch()
+
+        with pytest.raises(OSError, match="Lock for file"):
+            run_cli(["remove", "depA"], cwd)
+
+        assert gitmodules.read_text() == text
+        assert gitmodules_lock.exists()
+
     def test_remove_install_method_copy(self):
         dep_a = self._git.create_repository("depA")
         dep_b = self._git.create_repository("depB")
@@ -392,12 +438,14 @@ class TestCLI:
         repo = self._git.create_repository("test_repo")
         vendor_dir = repo.path() / "libs"
         vendor_dir.mkdir(parents=True, exist_ok=True)
-        os.chdir(vendor_dir)
+        cwd = vendor_dir
         run_cli(
-            ["add", str(dep_a.path().absolute()), "--install-method", "copy"]
+            ["add", str(dep_a.path()), "--install-method", "copy"],
+            cwd,
         )
         run_cli(
-            ["add", str(dep_b.path().absolute()), "--install-method", "copy"]
+            ["add", str(dep_b.path()), "--install-method", "copy"],
+            cwd,
         )
 
         toml_path = repo.path() / ".gitpkg.toml"
@@ -406,16 +454,14 @@ class TestCLI:
         assert_toml_pkg_exists(toml_path, "libs", "depA")
         assert_toml_pkg_exists(toml_path, "libs", "depB")
 
-        run_cli(["remove", "depA"])
+        run_cli(["remove", "depA"], cwd)
 
-        assert_toml_pkg_exists(toml_path, "libs", "depB")
+        data = _load_toml(toml_path)
 
-        data = tomllib.loads(toml_path.read_text())
+        assert_toml_pkg_exists(data, "libs", "depB")
         packages = data.get("packages", {}).get("libs", [])
 
-        assert (
-            len(list(filter(lambda pkg: pkg["name"] == "depA", packages))) == 0
-        )
+        assert not any(pkg["name"] == "depA" for pkg in packages)
         assert not repo.is_corrupted()
 
     def test_remove_with_multiple_dests(self):
@@ -423,18 +469,18 @@ class TestCLI:
         dep_b = self._git.create_repository("depB")
 
         repo = self._git.create_repository("test_repo")
-        os.chdir(repo.path())
+        cwd = repo.path()
 
         vendor_dir = repo.path() / "libs"
         vendor_dir.mkdir(parents=True, exist_ok=True)
         vendor_dir2 = repo.path() / "lib2"
         vendor_dir2.mkdir(parents=True, exist_ok=True)
 
-        run_cli(["dest", "add", "libs"])
-        run_cli(["dest", "add", "libs2"])
+        run_cli(["dest", "add", "libs"], cwd)
+        run_cli(["dest", "add", "libs2"], cwd)
 
-        run_cli(["add", str(dep_a.path().absolute()), "--dest-name", "libs"])
-        run_cli(["add", str(dep_b.path().absolute()), "--dest-name", "libs2"])
+        run_cli(["add", str(dep_a.path()), "--dest-name", "libs"], cwd)
+        run_cli(["add", str(dep_b.path()), "--dest-name", "libs2"], cwd)
 
         toml_path = repo.path() / ".gitpkg.toml"
 
@@ -444,33 +490,19 @@ class TestCLI:
         assert_toml_pkg_exists(toml_path, "libs", "depA")
         assert_toml_pkg_exists(toml_path, "libs2", "depB")
 
-        run_cli(["remove", "depA"])
+        run_cli(["remove", "depA"], cwd)
 
-        assert_toml_pkg_exists(toml_path, "libs2", "depB")
+        data = _load_toml(toml_path)
 
-        data = tomllib.loads(toml_path.read_text())
+        assert_toml_pkg_exists(data, "libs2", "depB")
 
-        assert (
-            len(
-                list(
-                    filter(
-                        lambda pkg: pkg["name"] == "depA",
-                        data.get("packages", {}).get("libs", []),
-                    )
-                )
-            )
-            == 0
+        assert not any(
+            pkg["name"] == "depA"
+            for pkg in data.get("packages", {}).get("libs", [])
         )
-        assert (
-            len(
-                list(
-                    filter(
-                        lambda pkg: pkg["name"] == "depA",
-                        data.get("packages", {}).get("libs2", []),
-                    )
-                )
-            )
-            == 0
+        assert not any(
+            pkg["name"] == "depA"
+            for pkg in data.get("packages", {}).get("libs2", [])
         )
         assert not repo.is_corrupted()
 
@@ -478,18 +510,18 @@ class TestCLI:
         the_one = self._git.create_repository("the_one")
 
         repo = self._git.create_repository("test_repo")
-        os.chdir(repo.path())
+        cwd = repo.path()
 
         vendor_dir = repo.path() / "libs"
         vendor_dir.mkdir(parents=True, exist_ok=True)
         vendor_dir2 = repo.path() / "lib2"
         vendor_dir2.mkdir(parents=True, exist_ok=True)
 
-        run_cli(["dest", "add", "libs"])
-        run_cli(["dest", "add", "libs2"])
+        run_cli(["dest", "add", "libs"], cwd)
+        run_cli(["dest", "add", "libs2"], cwd)
 
-        run_cli(["add", str(the_one.path().absolute()), "--dest-name", "libs"])
-        run_cli(["add", str(the_one.path().absolute()), "--dest-name", "libs2"])
+        run_cli(["add", str(the_one.path()), "--dest-name", "libs"], cwd)
+        run_cli(["add", str(the_one.path()), "--dest-name", "libs2"], cwd)
 
         toml_path = repo.path() / ".gitpkg.toml"
 
@@ -500,24 +532,17 @@ class TestCLI:
         assert_toml_pkg_exists(toml_path, "libs2", "the_one")
 
         with pytest.raises(AmbiguousDestinationError):
-            run_cli(["remove", "the_one"])
+            run_cli(["remove", "the_one"], cwd)
 
-        run_cli(["remove", "libs2/the_one"])
+        run_cli(["remove", "libs2/the_one"], cwd)
 
-        assert_toml_pkg_exists(toml_path, "libs", "the_one")
+        data = _load_toml(toml_path)
 
-        data = tomllib.loads(toml_path.read_text())
+        assert_toml_pkg_exists(data, "libs", "the_one")
 
-        assert (
-            len(
-                list(
-                    filter(
-                        lambda pkg: pkg["name"] == "the_one",
-                        data.get("packages", {}).get("libs2", []),
-                    )
-                )
-            )
-            == 0
+        assert not any(
+            pkg["name"] == "the_one"
+            for pkg in data.get("packages", {}).get("libs2", [])
         )
         assert not repo.is_corrupted()
 
@@ -531,12 +556,12 @@ class TestCLI:
 
         vendor_dir = repo.path() / "libs"
         vendor_dir.mkdir(parents=True, exist_ok=True)
-        os.chdir(vendor_dir)
+        cwd = vendor_dir
 
-        run_cli(["add", str(dep_a.path().absolute())])
-        run_cli(["add", str(dep_b.path().absolute())])
+        run_cli(["add", str(dep_a.path())], cwd)
+        run_cli(["add", str(dep_b.path())], cwd)
 
-        os.chdir(repo.path())
+        cwd = repo.path()
 
         toml_file = repo.path() / ".gitpkg.toml"
 
@@ -558,7 +583,7 @@ class TestCLI:
 
         toml_file.write_text(config.to_toml_string())
 
-        run_cli(["install"])
+        run_cli(["install"], cwd)
 
         assert not (repo.path() / "libs" / "depA" / "test.txt").exists()
         assert (repo.path() / "libs" / "depA" / "swag.txt").exists()
@@ -566,6 +591,42 @@ class TestCLI:
         assert (repo.path() / "libs" / "depB" / "42.txt").exists()
         assert not repo.is_corrupted()
 
+    def test_install_with_config_changes_cached_config(self):
+        dep_a = self._git.create_repository("depA")
+        dep_a.new_file("a/b/c/swag.txt")
+
+        repo = self._git.create_repository("test_repo")
+
+        vendor_dir = repo.path() / "libs"
+        vendor_dir.mkdir(parents=True, exist_ok=True)
+        cwd = vendor_dir
+
+        run_cli(["add", str(dep_a.path())], cwd)
+
+        cwd = repo.path()
+
+        toml_file = repo.path() / ".gitpkg.toml"
+        cache_file = repo.path() / ".git" / "gitpkg-config-cache.json"
+
+        # pretend the config has not been touched for a while
+        mtime = toml_file.stat().st_mtime - 60
+        os.utime(toml_file, (mtime, mtime))
+
+        run_cli(["list"], cwd)
+
+        assert cache_file.exists()
+
+        config = Config.from_path(toml_file)
+        config.packages["libs"][0].package_root = "a/b/c"
+        toml_file.write_text(config.to_toml_string())
+        os.utime(toml_file, (mtime + 1, mtime + 1))
+
+        run_cli(["install"], cwd)
+
+        assert not (repo.path() / "libs" / "depA" / "test.txt").exists()
+        assert (repo.path() / "libs" / "depA" / "swag.txt").exists()
+        assert not repo.is_corrupted()
+
     def test_install_with_config_changes_install_method_copy(self):
         dep_a = self._git.create_repository("depA")
         dep_a.new_file("a/b/c/swag.txt")
@@ -576,16 +637,18 @@ class TestCLI:
 
         vendor_dir = repo.path() / "libs"
         vendor_dir.mkdir(parents=True, exist_ok=True)
-        os.chdir(vendor_dir)
+        cwd = vendor_dir
 
         run_cli(
-            ["add", str(dep_a.path().absolute()), "--install-method", "copy"]
+            ["add", str(dep_a.path()), "--install-method", "copy"],
+            cwd,
         )
         run_cli(
-            ["add", str(dep_b.path().absolute()), "--install-method", "copy"]
+            ["add", str(dep_b.path()), "--install-method", "copy"],
+            cwd,
         )
 
-        os.chdir(repo.path())
+        cwd = repo.path()
 
         toml_file = repo.path() / ".gitpkg.toml"
 
@@ -607,7 +670,7 @@ class TestCLI:
 
         toml_file.write_text(config.to_toml_string())
 
-        run_cli(["install"])
+        run_cli(["install"], cwd)
 
         assert not (repo.path() / "libs" / "depA" / "test.txt").exists()
         assert (repo.path() / "libs" / "depA" / "swag.txt").exists()
@@ -615,7 +678,7 @@ class TestCLI:
         assert (repo.path() / "libs" / "depB" / "42.txt").exists()
         assert not repo.is_corrupted()
 
-    def test_install_with_everything_deleted(self):
+    def test_install_with_config_changes_and_failing_package(self):
         dep_a = self._git.create_repository("depA")
         dep_b = self._git.create_repository("depB")
 
@@ -623,62 +686,46 @@ class TestCLI:
 
         vendor_dir = repo.path() / "libs"
         vendor_dir.mkdir(parents=True, exist_ok=True)
-        os.chdir(vendor_dir)
+        cwd = vendor_dir
 
-        run_cli(["add", str(dep_a.path().absolute())])
-        run_cli(["add", str(dep_b.path().absolute())])
-
-        os.chdir(repo.path())
+        run_cli(["add", str(dep_a.path())], cwd)
+        run_cli(["add", str(dep_b.path())], cwd)
 
         gitmodules = repo.path() / ".gitmodules"
         gitpkgs = repo.path() / ".gitpkgs"
-        internal_dir = repo.path() / ".git" / "modules"
-
-        safe_dir_delete(internal_dir)
-        safe_dir_delete(internal_dir)
-        internal_dir.mkdir()
-        safe_dir_delete(gitpkgs)
-        gitmodules.unlink()
 
-        run_cli(["install"])
-
-        assert gitmodules.exists()
-        assert gitpkgs.exists()
-        assert (vendor_dir / "depA").exists()
-        assert (vendor_dir / "depB").exists()
-        assert not repo.is_corrupted()
-
-    def test_install_with_only_internal_dir_deleted(self):
-        dep_a = self._git.create_repository("depA")
-        dep_b = self._git.create_repository("depB")
-
-        repo = self._git.create_repository("test_repo")
-
-        vendor_dir = repo.path() / "libs"
-        vendor_dir.mkdir(parents=True, exist_ok=True)
-        os.chdir(vendor_dir)
+        pm = PkgManager.from_path(repo.path())
+        dest = pm.find_destination("libs")
+        pkg_a = pm.find_package(dest, "depA")
+        pkg_b = pm.find_package(dest, "depB")
+        old_ident = pm.package_identifier(dest, pkg_a)
 
-        run_cli(["add", str(dep_a.path().absolute())])
-        run_cli(["add", str(dep_b.path().absolute())])
+        # a new branch replaces depA, the package root of depB is missing
+        branch = Repo(dep_a.path()).active_branch.name
+        packages = [
+            (dest, replace(pkg_a, branch=branch)),
+            (dest, replace(pkg_b, package_root="missing")),
+        ]
 
-        os.chdir(repo.path())
-
-        gitmodules = repo.path() / ".gitmodules"
-        gitpkgs = repo.path() / ".gitpkgs"
-        internal_dir = repo.path() / ".git" / "modules"
-
-        safe_dir_delete(internal_dir)
-        internal_dir.mkdir()
-
-        run_cli(["install"])
+        with pytest.raises(PackageRootDirNotFoundError):
+            list(pm.install_packages(packages))
 
-        assert gitmodules.exists()
-        assert gitpkgs.exists()
+        # the old checkout of depA has been cleaned up nonetheless
+        assert not (gitpkgs / old_ident).exists()
+        assert old_ident not in gitmodules.read_text()
         assert (vendor_dir / "depA").exists()
-        assert (vendor_dir / "depB").exists()
-        assert not repo.is_corrupted()
 
-    def test_install_with_only_gitmodules_deleted(self):
+    @pytest.mark.parametrize(
+        "deleted",
+        [
+            ("internal_dir", "gitpkgs", "gitmodules"),
+            ("internal_dir",),
+            ("gitmodules",),
+            ("gitpkgs",),
+        ],
+        ids=["everything", "internal_dir", "gitmodules", "gitpkgs"],
+    )
+    def test_install_with_deleted(self, deleted: tuple[str, ...]):
         dep_a = self._git.create_repository("depA")
         dep_b = self._git.create_repository("depB")
 
@@ -686,48 +733,26 @@ class TestCLI:
 
         vendor_dir = repo.path() / "libs"
         vendor_dir.mkdir(parents=True, exist_ok=True)
-        os.chdir(vendor_dir)
+        cwd = vendor_dir
 
-        run_cli(["add", str(dep_a.path().absolute())])
-        run_cli(["add", str(dep_b.path().absolute())])
+        run_cli(["add", str(dep_a.path())], cwd)
+        run_cli(["add", str(dep_b.path())], cwd)
 
-        os.chdir(repo.path())
+        cwd = repo.path()
 
         gitmodules = repo.path() / ".gitmodules"
         gitpkgs = repo.path() / ".gitpkgs"
         internal_dir = repo.path() / ".git" / "modules"
 
-        gitmodules.unlink()
-
-        run_cli(["install"])
-
-        assert gitmodules.exists()
-        assert gitpkgs.exists()
-        assert (vendor_dir / "depA").exists()
-        assert (vendor_dir / "depB").exists()
-        assert not repo.is_corrupted()
-
-    def test_install_with_only_gitpkgs_deleted(self):
-        dep_a = self._git.create_repository("depA")
-        dep_b = self._git.create_repository("depB")
-
-        repo = self._git.create_repository("test_repo")
-
-        vendor_dir = repo.path() / "libs"
-        vendor_dir.mkdir(parents=True, exist_ok=True)
-        os.chdir(vendor_dir)
-
-        run_cli(["add", str(dep_a.path().absolute())])
-        run_cli(["add", str(dep_b.path().absolute())])
-
-        os.chdir(repo.path())
-
-        gitmodules = repo.path() / ".gitmodules"
-        gitpkgs = repo.path() / ".gitpkgs"
-
-        safe_dir_delete(gitpkgs)
+        if "internal_dir" in deleted:
+            self._git.discard(internal_dir)
+            internal_dir.mkdir()
+        if "gitpkgs" in deleted:
+            self._git.discard(gitpkgs)
+        if "gitmodules" in deleted:
+            gitmodules.unlink()
 
-        run_cli(["install"])
+        run_cli(["install"], cwd)
 
         assert gitmodules.exists()
         assert gitpkgs.exists()
@@ -743,12 +768,12 @@ class TestCLI:
 
         vendor_dir = repo.path() / "libs"
         vendor_dir.mkdir(parents=True, exist_ok=True)
-        os.chdir(vendor_dir)
+        cwd = vendor_dir
 
-        run_cli(["add", str(dep_a.path().absolute())])
-        run_cli(["add", str(dep_b.path().absolute())])
+        run_cli(["add", str(dep_a.path())], cwd)
+        run_cli(["add", str(dep_b.path())], cwd)
 
-        os.chdir(repo.path())
+        cwd = repo.path()
 
         dep_a.new_file("updated.txt")
 
@@ -756,7 +781,7 @@ class TestCLI:
 
         assert not updated_file.exists()
 
-        run_cli(["update"])
+        run_cli(["update"], cwd)
 
         assert updated_file.exists()
 
@@ -773,12 +798,12 @@ class TestCLI:
 
         vendor_dir = repo.path() / "libs"
         vendor_dir.mkdir(parents=True, exist_ok=True)
-        os.chdir(vendor_dir)
+        cwd = vendor_dir
 
-        run_cli(["add", str(dep_a.path().absolute())])
-        run_cli(["add", str(dep_b.path().absolute())])
+        run_cli(["add", str(dep_a.path())], cwd)
+        run_cli(["add", str(dep_b.path())], cwd)
 
-        os.chdir(repo.path())
+        cwd = repo.path()
 
         dep_a.new_file("updated.txt")
 
@@ -793,17 +818,17 @@ class TestCLI:
 
         assert checksum(new_file) == new_file_after_change
 
-        run_cli(["update", "depA"])
+        run_cli(["update", "depA"], cwd)
 
         assert checksum(new_file) == new_file_after_change
 
-        run_cli(["update", "depA", "--force"])
+        run_cli(["update", "depA", "--force"], cwd)
 
         assert checksum(new_file) == new_file_before_change
 
         assert untracked_file.exists()
 
-        run_cli(["update", "--force"])
+        run_cli(["update", "--force"], cwd)
 
         assert not untracked_file.exists()
 
@@ -815,12 +840,12 @@ class TestCLI:
 
         vendor_dir = repo.path() / "libs"
         vendor_dir.mkdir(parents=True, exist_ok=True)
-        os.chdir(vendor_dir)
+        cwd = vendor_dir
 
-        run_cli(["add", str(dep_a.path().absolute()), "--disable-updates"])
-        run_cli(["add", str(dep_b.path().absolute())])
+        run_cli(["add", str(dep_a.path()), "--disable-updates"], cwd)
+        run_cli(["add", str(dep_b.path())], cwd)
 
-        os.chdir(repo.path())
+        cwd = repo.path()
 
         dep_a.new_file("updated.txt")
         dep_a.change_file("updated.txt")
@@ -835,7 +860,7 @@ class TestCLI:
         assert not dep_a_updated_file.exists()
         assert not dep_b_updated_file.exists()
 
-        run_cli(["update"])
+        run_cli(["update"], cwd)
 
         assert not dep_a_updated_file.exists()
         assert dep_b_updated_file.exists()
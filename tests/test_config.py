@@ -0,0 +1,89 @@
+from pathlib import Path
+
+import pytest
+
+from gitpkg.config import Config
+
+_PACKAGE = """\
+[[packages.libs]]
+name = "gitpkg"
+url = "https://github.com/atomicptr/gitpkg"
+package-root = "."
+"""
+
+
+def write_config(tmp_path: Path, text: str) -> Path:
+    path = tmp_path / ".gitpkg.toml"
+    path.write_text(text)
+    return path
+
+
+def test_parse_config(tmp_path: Path):
+    path = write_config(
+        tmp_path,
+        _PACKAGE
+        + 'updates-disabled = true\nbranch = "main"\n\n'
+        + '[[destinations]]\nname = "libs"\npath = "libs"\n',
+    )
+
+    config = Config.from_path(path)
+
+    pkg = config.packages["libs"][0]
+
+    assert pkg.name == "gitpkg"
+    assert pkg.package_root == "."
+    assert pkg.updates_disabled is True
+    assert pkg.branch == "main"
+    assert pkg.install_method is None
+    assert config.destinations[0].path == "libs"
+
+
+@pytest.mark.parametrize(
+    ("extra", "field"),
+    [
+        ('updates-disabled = "false"', "updates-disabled"),
+        ("branch = 1", "branch"),
+        ("install-method = true", "install-method"),
+    ],
+)
+def test_parse_config_wrong_type(tmp_path: Path, extra: str, field: str):
+    path = write_config(tmp_path, f"{_PACKAGE}{extra}\n")
+
+    with pytest.raises(ValueError, match=f'packages\\["libs"\\].{field}\''):
+        Config.from_path(path)
+
+
+def test_parse_config_wrong_type_destination(tmp_path: Path):
+    path = write_config(tmp_path, '[[destinations]]\nname = "libs"\npath = 1\n')
+
+    with pytest.raises(ValueError, match="'Config.destinations.path'"):
+        Config.from_path(path)
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        'destinations = ["libs"]\n',
+        'packages = "libs"\n',
+        'packages = { libs = "gitpkg" }\n',
+    ],
+)
+def test_parse_config_not_a_table(tmp_path: Path, text: str):
+    path = write_config(tmp_path, text)
+
+    with pytest.raises(ValueError, match="must be a"):
+        Config.from_path(path)
+
+
+def test_parse_config_unknown_key(tmp_path: Path):
+    path = write_config(tmp_path, f'{_PACKAGE}homepage = "example.com"\n')
+
+    with pytest.raises(ValueError, match="'Config.packages.*homepage' does"):
+        Config.from_path(path)
+
+
+def test_parse_config_snake_case_key(tmp_path: Path):
+    path = write_config(tmp_path, f'{_PACKAGE}package_root = "src"\n')
+
+    with pytest.raises(ValueError, match="Underscore found in TOML key"):
+        Config.from_path(path)
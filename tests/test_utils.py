@@ -1,14 +1,31 @@
-from gitpkg.utils import parse_repository_url
+import stat
+from pathlib import Path
+
+import pytest
+
+from gitpkg.utils import (
+    extract_repository_name_from_url,
+    is_windows,
+    parse_repository_url,
+    write_text_atomic,
+)
 from tests import GitComposer
 
 
-def test_parse_repository_url():
-    git = GitComposer()
-    git.setup("test_parse_repository_url")
+def assert_repository_name(input_url: str, expected_name: str) -> None:
+    res = parse_repository_url(input_url)
+
+    assert res is not None, f"Could not parse {input_url}"
 
-    repo_path = git.create_repository("test_repo")
+    _, name = res
 
-    for input_url, expected_name in [
+    assert name == expected_name
+    assert extract_repository_name_from_url(input_url) == expected_name
+
+
+@pytest.mark.parametrize(
+    ("input_url", "expected_name"),
+    [
         ("https://github.com/atomicptr/gitpkg", "gitpkg"),
         ("https://github.com/atomicptr/gitpkg.git", "gitpkg"),
         ("ssh://git@github.com:atomicptr/gitpkg.git", "gitpkg"),
@@ -17,16 +34,44 @@ def test_parse_repository_url():
         ("https://gitlab.com/gitlab-org/gitlab-core-team/general", "general"),
         ("git@gitlab.com:gitlab-org/gitlab-core-team/general.git", "general"),
         ("ssh://root@8.8.8.8:443/path/to/repo.git", "repo"),
-        (str(repo_path.path().absolute()), "test_repo"),
-    ]:
-        res = parse_repository_url(input_url)
+    ],
+)
+def test_parse_repository_url(input_url: str, expected_name: str):
+    assert_repository_name(input_url, expected_name)
+
+
+def test_parse_repository_url_local_path():
+    git = GitComposer()
+    git.setup("test_parse_repository_url_local_path")
+
+    try:
+        repo = git.create_repository("test_repo")
+        assert_repository_name(str(repo.path()), "test_repo")
+    finally:
+        git.teardown()
+
+
+@pytest.mark.skipif(is_windows(), reason="file modes are not kept on win")
+def test_write_text_atomic(tmp_path: Path):
+    path = tmp_path / ".gitpkg.toml"
+
+    write_text_atomic(path, "a")
+    path.chmod(0o640)
+    write_text_atomic(path, "b")
+
+    assert path.read_text() == "b"
+    assert stat.S_IMODE(path.stat().st_mode) == 0o640
+    assert list(tmp_path.iterdir()) == [path]
 
-        if expected_name is None:
-            assert res is None
-            continue
 
-        assert res is not None, f"Could not parse {input_url}"
+@pytest.mark.skipif(is_windows(), reason="symlinks need privileges on win")
+def test_write_text_atomic_symlink(tmp_path: Path):
+    target = tmp_path / "config.toml"
+    target.write_text("a")
+    path = tmp_path / ".gitpkg.toml"
+    path.symlink_to(target.name)
 
-        _, name = res
+    write_text_atomic(path, "b")
 
-        assert name == expected_name
+    assert path.is_symlink()
+    assert target.read_text() == "b"